@@ -0,0 +1,125 @@
+import gzip
+import json
+import os
+from datetime import datetime
+
+from job_schema import job_dict
+
+ARCHIVE_DIR = 'archive'
+MANIFEST_FILE = 'manifest.json'
+
+# Compression codec -> partition file extension
+CODECS = {'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+
+
+def open_compressed(path, mode, codec):
+    """Open a gzip or zstd compressed file as UTF-8 text ('r' or 'w')"""
+    if codec == 'gzip':
+        return gzip.open(path, mode + 't', compresslevel=6, encoding='utf-8')
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd archives need zstandard: pip install zstandard")
+        return zstandard.open(path, mode + 't', encoding='utf-8')
+    raise ValueError(f"Unknown codec '{codec}', expected one of: {', '.join(CODECS)}")
+
+
+def load_manifest(archive_dir=ARCHIVE_DIR):
+    """The archive's manifest, {'partitions': [...]} sorted by date, name and path"""
+    try:
+        with open(os.path.join(archive_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'partitions': []}
+
+
+def _save_manifest(archive_dir, manifest):
+    path = os.path.join(archive_dir, MANIFEST_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def write_lines(lines, archive_dir=ARCHIVE_DIR, name='jobs', codec='gzip', scrape_date=None, append=False):
+    """Write NDJSON lines as the name partition of scrape_date (default today), return its manifest entry
+
+    Partitions are <archive_dir>/<YYYY-MM-DD>/<name>.ndjson.gz (or .zst). Writing
+    the same name on the same date replaces that partition, whatever its codec.
+    With append, for runs that only archive what is new, each call adds its own
+    <name>-<HHMMSS> partition under name instead, keeping the earlier ones.
+    The file is written to a temporary name first and the manifest is updated
+    after it is in place.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}', expected one of: {', '.join(CODECS)}")
+    now = datetime.now()
+    scrape_date = scrape_date or now.strftime('%Y-%m-%d')
+    filename = name
+    if append:
+        filename = f"{name}-{now.strftime('%H%M%S')}"
+        while os.path.exists(os.path.join(archive_dir, scrape_date, filename + CODECS[codec])):
+            filename += '_'
+    partition = f"{scrape_date}/{filename}{CODECS[codec]}"
+    path = os.path.join(archive_dir, scrape_date, filename + CODECS[codec])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    count = 0
+    with open_compressed(path + '.tmp', 'w', codec) as f:
+        for line in lines:
+            f.write(line if line.endswith('\n') else line + '\n')
+            count += 1
+    os.replace(path + '.tmp', path)
+
+    entry = {
+        'date': scrape_date,
+        'name': name,
+        'path': partition,
+        'codec': codec,
+        'jobs': count,
+        'bytes': os.path.getsize(path),
+        'written_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    manifest = load_manifest(archive_dir)
+    partitions = [entry]
+    for old in manifest['partitions']:
+        if append or (old['date'], old['name']) != (scrape_date, name):
+            partitions.append(old)
+        elif old['path'] != partition:
+            # Same partition written with the other codec before
+            try:
+                os.remove(os.path.join(archive_dir, old['path']))
+            except FileNotFoundError:
+                pass
+    manifest['partitions'] = sorted(partitions, key=lambda p: (p['date'], p['name'], p['path']))
+    _save_manifest(archive_dir, manifest)
+    print(f"✓ Archived {count} jobs to {path} ({entry['bytes'] / 1024:.1f} KB)")
+    return entry
+
+
+def write_partition(jobs, archive_dir=ARCHIVE_DIR, name='jobs', codec='gzip', scrape_date=None, append=False):
+    """Archive job records (JobRecord or dicts) as one compressed NDJSON partition"""
+    lines = (json.dumps(job_dict(job), ensure_ascii=False) for job in jobs)
+    return write_lines(lines, archive_dir, name, codec, scrape_date, append)
+
+
+def archive_jsonl(filename, archive_dir=ARCHIVE_DIR, name='jobs', codec='gzip', scrape_date=None):
+    """Archive an existing NDJSON file (such as costa_rica_jobs_full.jsonl) as is"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        return write_lines((line for line in f if line.strip()), archive_dir, name, codec, scrape_date)
+
+
+def read_archive(archive_dir=ARCHIVE_DIR, since=None, until=None, names=None):
+    """Yield the jobs of the partitions dated since..until (inclusive, YYYY-MM-DD), oldest first
+
+    Only the partitions the manifest lists in that range (and with one of names,
+    if given) are opened.
+    """
+    for partition in load_manifest(archive_dir)['partitions']:
+        if since and partition['date'] < since or until and partition['date'] > until:
+            continue
+        if names and partition['name'] not in names:
+            continue
+        with open_compressed(os.path.join(archive_dir, partition['path']), 'r', partition['codec']) as f:
+            for line in f:
+                yield json.loads(line)
@@ -0,0 +1,218 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+
+from charset import decode_html
+from field_index import FieldIndex
+from listing_scan import scan_job_links
+from parser_backend import available_parsers
+from two_page_scraper import LABEL_PATTERNS, TAG_RULES, CostaRicaJobsScraper
+
+BENCHMARK_BASELINE_FILE = 'benchmark_baseline.json'
+
+# Output field -> extractor method taking a FieldIndex, timed one by one on prebuilt indexes
+FIELD_EXTRACTORS = [
+    ('_job_location', 'extract_location'),
+    ('_job_salary', 'extract_salary'),
+    ('_job_featured_image', 'extract_featured_image'),
+    ('_job_title', 'extract_title'),
+    ('_job_featured', 'is_featured'),
+    ('_job_urgent', 'is_urgent'),
+    ('_job_description', 'extract_description'),
+    ('_job_category', 'extract_category'),
+    ('_job_type', 'extract_type'),
+    ('_job_gender', 'extract_gender'),
+    ('_job_apply_email', 'extract_email'),
+    ('_job_salary_type', 'extract_salary_type'),
+    ('_job_experience', 'extract_experience'),
+    ('_job_career_level', 'extract_career_level'),
+    ('_job_qualification', 'extract_qualification'),
+    ('_job_video_url', 'extract_video'),
+    ('_job_photos', 'extract_photos'),
+    ('_job_application_deadline_date', 'extract_deadline'),
+]
+
+
+def load_corpus(path):
+    """Return (listing pages, detail pages) as lists of (url, html) from a cassette or a folder of .html files
+
+    A cassette is what --record writes. In a plain folder, files named listing*.html
+    are listing pages and every other .html file is a job detail page.
+    """
+    listings, details = [], []
+    for name in sorted(os.listdir(path)):
+        full_path = os.path.join(path, name)
+        if name.endswith('.json'):
+            with open(full_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            try:
+                with open(full_path[:-len('.json')] + '.body.gz', 'rb') as f:
+                    body = gzip.decompress(f.read())
+            except OSError:
+                continue
+            if meta['status'] != 200:
+                continue
+            content_type = next((v for k, v in meta['headers'].items() if k.lower() == 'content-type'), None)
+            url, html = meta['url'], decode_html(body, content_type)[0]
+        elif name.endswith('.html'):
+            with open(full_path, 'rb') as f:
+                url, html = name, decode_html(f.read())[0]
+        else:
+            continue
+        is_detail = '/puesto/' in url if name.endswith('.json') else not name.startswith('listing')
+        (details if is_detail else listings).append((url, html))
+    return listings, details
+
+
+def best_time(fn, repeat):
+    """Fastest of repeat runs of fn(), in seconds"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def rate(count, seconds):
+    return round(count / seconds, 2) if seconds else 0.0
+
+
+def bench_parser(scraper, parser, listings, details, repeat):
+    """Measure one parser backend over the corpus"""
+    result = {}
+
+    def parse_listings():
+        for _, html in listings:
+            scraper._extract_job_urls(BeautifulSoup(html, parser))
+
+    def scan_listings():
+        for _, html in listings:
+            scan_job_links(html, scraper.base_url)
+
+    def parse_pagination():
+        for _, html in listings:
+            scraper._find_pagination(BeautifulSoup(html, parser))
+
+    def parse_details():
+        for url, html in details:
+            scraper.extract_job_data(BeautifulSoup(html, parser), url)
+
+    if listings:
+        result['listing_pages_per_sec'] = rate(len(listings), best_time(parse_listings, repeat))
+        result['listing_scan_pages_per_sec'] = rate(len(listings), best_time(scan_listings, repeat))
+        result['pagination_pages_per_sec'] = rate(len(listings), best_time(parse_pagination, repeat))
+    if details:
+        result['detail_pages_per_sec'] = rate(len(details), best_time(parse_details, repeat))
+
+        # Per-field cost on already built soups, in milliseconds per page
+        soups = [(url, BeautifulSoup(html, parser)) for url, html in details]
+        indexes = [FieldIndex(soup, LABEL_PATTERNS, TAG_RULES) for _, soup in soups]
+        fields = {
+            'soup': best_time(lambda: [BeautifulSoup(html, parser) for _, html in details], repeat),
+            'field_index': best_time(lambda: [FieldIndex(soup, LABEL_PATTERNS, TAG_RULES) for _, soup in soups], repeat),
+        }
+        for field, method_name in FIELD_EXTRACTORS:
+            method = getattr(scraper, method_name)
+            fields[field] = best_time(lambda: [method(index) for index in indexes], repeat)
+        result['field_ms_per_page'] = {name: round(seconds * 1000 / len(details), 4)
+                                       for name, seconds in fields.items()}
+
+        # clean_text on the raw page text, which still holds the mangled characters
+        texts = [index.text for index in indexes]
+        seconds = best_time(lambda: [scraper.clean_text(text) for text in texts], repeat)
+        result['clean_text_calls_per_sec'] = rate(len(texts), seconds)
+
+    tracemalloc.start()
+    parse_listings()
+    parse_details()
+    result['peak_memory_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, tolerance, min_field_ms=0.01):
+    """Print the change against the baseline, return the regressions beyond tolerance
+
+    Fields cheaper than min_field_ms per page are too small to time reliably and never count.
+    """
+    regressions = []
+    for parser, metrics in results.items():
+        old_metrics = baseline.get(parser)
+        if not old_metrics:
+            print(f"\n{parser}: no baseline")
+            continue
+        print(f"\n{parser}:")
+        flat = dict(metrics, **{f'field {k}': v for k, v in metrics.get('field_ms_per_page', {}).items()})
+        old_flat = dict(old_metrics, **{f'field {k}': v for k, v in old_metrics.get('field_ms_per_page', {}).items()})
+        for name, value in flat.items():
+            old = old_flat.get(name)
+            if not isinstance(value, (int, float)) or not old:
+                continue
+            # Rates should not drop, times and memory should not grow
+            higher_is_better = name.endswith('per_sec')
+            change = (value - old) / old
+            worse = -change if higher_is_better else change
+            flag = ''
+            too_small = name.startswith('field ') and max(old, value) < min_field_ms
+            if worse > tolerance and not too_small:
+                flag = '  ⚠️  REGRESSION'
+                regressions.append((parser, name, old, value))
+            print(f"  {name:45} {old:>12} -> {value:<12} ({change:+.1%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark listing parsing, detail extraction and clean_text over saved empleos.net pages")
+    parser.add_argument('corpus', help="cassette directory written by --record, or a folder of .html files")
+    parser.add_argument('--parsers', nargs='+', default=None,
+                        help="parser backends to measure (default: every installed one)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per measurement, the fastest counts")
+    parser.add_argument('--baseline', default=BENCHMARK_BASELINE_FILE, help="baseline file to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed slowdown before a metric counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    listings, details = load_corpus(args.corpus)
+    if not listings and not details:
+        print(f"⚠️ No pages found in {args.corpus}")
+        return 1
+    print(f"Corpus: {len(listings)} listing pages, {len(details)} detail pages")
+
+    scraper = CostaRicaJobsScraper(workers=1)
+    results = {}
+    for backend in args.parsers or available_parsers():
+        print(f"Benchmarking {backend}...")
+        results[backend] = bench_parser(scraper, backend, listings, details, args.repeat)
+
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} - run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} metrics regressed by more than {args.tolerance:.0%}")
+        return 1
+    print("\n✓ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from http_cache import SKIP_HEADERS
+
+
+class CassetteAdapter(HTTPAdapter):
+    """HTTPAdapter that records responses to a cassette directory or replays them offline
+
+    In record mode every response is sent as usual and saved as
+    <sha256(url)>.json (URL, status, reason, headers) plus a gzipped body.
+    In replay mode nothing goes to the network: recorded responses are served
+    from the cassette and anything else gets a 404 "Not in cassette".
+    """
+
+    def __init__(self, cassette_dir, record=False, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette_dir = cassette_dir
+        self.record = record
+        self.lock = threading.Lock()
+        self.recorded = 0
+        self.played = 0
+        self.missing = 0
+        if record:
+            os.makedirs(cassette_dir, exist_ok=True)
+        elif not os.path.isdir(cassette_dir):
+            raise FileNotFoundError(f"No cassette at {cassette_dir} - record one first")
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cassette_dir, key)
+        return base + '.json', base + '.body.gz'
+
+    def _save(self, url, response):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in SKIP_HEADERS},
+        }
+        suffix = f".{threading.get_ident()}.tmp"
+        with open(body_path + suffix, 'wb') as f:
+            f.write(gzip.compress(response.content))
+        os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+        os.replace(meta_path + suffix, meta_path)
+
+    def _replay(self, request):
+        meta_path, body_path = self._paths(request.url)
+        response = Response()
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = gzip.decompress(f.read())
+        except (OSError, ValueError):
+            with self.lock:
+                self.missing += 1
+            response.status_code = 404
+            response.reason = 'Not in cassette'
+            response._content = b''
+            return response
+        with self.lock:
+            self.played += 1
+        response.status_code = meta['status']
+        response.reason = meta['reason']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        return response
+
+    def send(self, request, **kwargs):
+        if not self.record:
+            return self._replay(request)
+        response = super().send(request, **kwargs)
+        self._save(request.url, response)
+        with self.lock:
+            self.recorded += 1
+        return response
+
+    def summary(self):
+        if self.record:
+            return f"cassette {self.cassette_dir}: recorded {self.recorded} responses"
+        return f"cassette {self.cassette_dir}: replayed {self.played} responses, {self.missing} not recorded"
@@ -0,0 +1,79 @@
+import codecs
+import re
+
+# Browsers look for <meta charset> in the first 1024 bytes; empleos.net puts scripts
+# ahead of it in <head>, so look a little further
+META_SNIFF_BYTES = 4096
+
+# Tried in order when neither the headers nor the page name an encoding that works
+FALLBACK_ENCODINGS = ('utf-8', 'cp1252')
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+# Matches both <meta charset="..."> and <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+# Pages labelled Latin-1 are written as Windows-1252 in practice (browsers treat them the same way)
+LATIN1_NAMES = {'latin_1', 'iso8859_1', 'ascii'}
+
+
+def normalize_encoding(name):
+    """Python codec name for a charset label, or None when Python does not know it"""
+    if not name:
+        return None
+    try:
+        codec = codecs.lookup(name.strip().strip('"\'')).name
+    except LookupError:
+        return None
+    return 'cp1252' if codec.replace('-', '_') in LATIN1_NAMES else codec
+
+
+def header_encoding(content_type):
+    """Charset named in a Content-Type header, or None"""
+    match = HEADER_CHARSET.search(content_type or '')
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def meta_encoding(content):
+    """Charset named by a <meta> tag near the start of the page, or None"""
+    match = META_CHARSET.search(content[:META_SNIFF_BYTES])
+    return normalize_encoding(match.group(1).decode('ascii', 'ignore')) if match else None
+
+
+def decode_html(content, content_type=None):
+    """Decode a page body once and return (text, encoding)
+
+    The encoding comes from a byte order mark, then the charset in the
+    Content-Type header, then a <meta charset> in the first bytes of the page.
+    A declared encoding the bytes do not decode with is skipped, since a page
+    saved as Windows-1252 but labelled UTF-8 is what leaves � in the text.
+    Without a working declaration UTF-8 is tried, then Windows-1252, which
+    decodes almost any byte, and anything left undecodable becomes �.
+    Unlike response.text this never falls back to the slow apparent_encoding guess.
+    """
+    if not content:
+        return '', None
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return content.decode(encoding, errors='replace'), encoding
+
+    tried = set()
+    for encoding in (header_encoding(content_type), meta_encoding(content)) + FALLBACK_ENCODINGS:
+        if not encoding or encoding in tried:
+            continue
+        tried.add(encoding)
+        try:
+            return content.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    return content.decode(FALLBACK_ENCODINGS[-1], errors='replace'), FALLBACK_ENCODINGS[-1]
+
+
+def response_html(response):
+    """Text of a requests response, decoded with decode_html instead of response.text"""
+    return decode_html(response.content, response.headers.get('Content-Type'))[0]
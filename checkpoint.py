@@ -0,0 +1,92 @@
+import json
+import os
+from datetime import datetime
+
+CHECKPOINT_FILE = 'scrape_checkpoint.json'
+
+
+class CrawlCheckpoint:
+    """Progress of a multi-page crawl, saved to disk so an interrupted run can resume
+
+    Holds the pages already finished, every job ID taken from them
+    (all_job_ids / page_job_ids in scrape_all_pages) and the job URLs of the
+    current page that are not done yet, plus the failed job URLs still waiting
+    for a retry (see retry_queue.py), and the size of each sink file when
+    it was last synced (see sinks.py). complete is set once the crawl ends
+    normally, and the file is then removed.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.next_page = 1
+        self.completed_pages = []
+        self.job_ids = []
+        self.page_job_ids = {}
+        self.pending_urls = []
+        self.retry_urls = []
+        self.sink_offsets = {}
+        self.complete = False
+
+    @classmethod
+    def load(cls, path=CHECKPOINT_FILE):
+        """Load a saved checkpoint, or start a fresh one if there is none"""
+        checkpoint = cls(path)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            checkpoint.next_page = state['next_page']
+            checkpoint.completed_pages = state['completed_pages']
+            checkpoint.job_ids = state['job_ids']
+            checkpoint.page_job_ids = {int(page): ids for page, ids in state['page_job_ids'].items()}
+            checkpoint.pending_urls = state['pending_urls']
+            checkpoint.retry_urls = state.get('retry_urls', [])
+            checkpoint.sink_offsets = state.get('sink_offsets', {})
+            print(f"Resuming from {path}: {len(checkpoint.completed_pages)} pages done, "
+                  f"{len(checkpoint.pending_urls)} jobs pending on page {checkpoint.next_page}")
+        return checkpoint
+
+    @property
+    def resuming(self):
+        return bool(self.completed_pages or self.pending_urls or self.retry_urls)
+
+    def save(self):
+        """Write the checkpoint atomically"""
+        state = {
+            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'next_page': self.next_page,
+            'completed_pages': self.completed_pages,
+            'job_ids': self.job_ids,
+            'page_job_ids': self.page_job_ids,
+            'pending_urls': self.pending_urls,
+            'retry_urls': self.retry_urls,
+            'sink_offsets': self.sink_offsets,
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def start_page(self, page, page_ids, job_urls):
+        self.next_page = page
+        self.page_job_ids[page] = page_ids
+        self.job_ids = sorted(set(self.job_ids) | set(page_ids))
+        self.pending_urls = list(job_urls)
+        self.save()
+
+    def job_done(self, job_url):
+        if job_url in self.pending_urls:
+            self.pending_urls.remove(job_url)
+        if job_url in self.retry_urls:
+            self.retry_urls.remove(job_url)
+
+    def finish_page(self, page):
+        self.completed_pages.append(page)
+        self.next_page = page + 1
+        self.pending_urls = []
+        self.save()
+
+    def finish(self):
+        """Mark the crawl complete and remove the file"""
+        self.complete = True
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from job_schema import JOB_FIELDS, extract_job_id, has_fallback_deadline, job_dict
+
+DELTA_FILE = 'costa_rica_jobs_delta.json'
+INDEX_FILE = 'costa_rica_jobs_index.json'
+
+# Recomputed from the scrape date on every run, so not a change of the posting
+IGNORED_FIELDS = {'_job_expiry_date'}
+
+
+def job_key(job):
+    """Job ID of a record, or its URL when it has none"""
+    url = job.get('_job_apply_url', '')
+    return extract_job_id(url) or url
+
+
+def content_hash(job):
+    """Short hash of the fields that describe the posting
+
+    A deadline the page did not give is the expiry date the extractors fall
+    back to, which also moves with the scrape date, so it is hashed as ''.
+    """
+    fallback = has_fallback_deadline(job)
+    content = [
+        '' if fallback and field == '_job_application_deadline_date' else job.get(field, '')
+        for field in JOB_FIELDS if field not in IGNORED_FIELDS
+    ]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def load_index(path=INDEX_FILE, snapshot=None):
+    """{job_id: content hash} of the previous run
+
+    Without an index file, the index is built from snapshot (a full JSON export
+    such as costa_rica_jobs.json) if there is one, otherwise it is empty.
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['jobs']
+    if snapshot and os.path.exists(snapshot):
+        with open(snapshot, 'r', encoding='utf-8') as f:
+            return {job_key(job): content_hash(job) for job in json.load(f)}
+    return {}
+
+
+def compute_delta(previous, jobs):
+    """Compare jobs with the previous index, return (delta, new index)
+
+    delta holds the added and changed jobs as _job_* dicts and the IDs of
+    the removed ones, in the order they were scraped. Removed means not in
+    jobs: when jobs is only part of the site, such as the first listings page
+    firstPage_scraper covers, a job that moved past it counts as removed, and
+    as added again if it comes back.
+    """
+    index = {}
+    added, changed = [], []
+    for job in jobs:
+        key = job_key(job)
+        digest = content_hash(job)
+        index[key] = digest
+        if key not in previous:
+            added.append(job_dict(job))
+        elif previous[key] != digest:
+            changed.append(job_dict(job))
+    removed = [key for key in previous if key not in index]
+    delta = {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'previous_jobs': len(previous),
+        'current_jobs': len(index),
+        'added': added,
+        'changed': changed,
+        'removed': removed,
+    }
+    return delta, index
+
+
+def _write_json(path, data):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def write_delta(jobs, delta_file=DELTA_FILE, index_file=INDEX_FILE, snapshot=None):
+    """Write the delta against the previous run to delta_file and the new index to index_file, return the delta
+
+    The index is only rewritten when something changed and holds no timestamp,
+    so an unchanged run leaves it byte for byte the same.
+    """
+    previous = load_index(index_file, snapshot)
+    delta, index = compute_delta(previous, jobs)
+    _write_json(delta_file, delta)
+    if index != previous or not os.path.exists(index_file):
+        _write_json(index_file, {'jobs': index})
+    print(f"✓ Delta: {len(delta['added'])} added, {len(delta['changed'])} changed, "
+          f"{len(delta['removed'])} removed - saved to {delta_file}")
+    return delta
@@ -0,0 +1,90 @@
+import re
+from bs4 import CData, NavigableString, Tag
+
+# String types included by soup.get_text() - comments, scripts and styles are skipped
+TEXT_TYPES = (NavigableString, CData)
+
+
+class FieldIndex:
+    """Walk a parsed job page once and index the label texts and tags the extractors need
+
+    label_patterns maps a label name to a compiled regex. The first text node
+    matching each pattern is kept, exactly like soup.find(text=pattern).
+
+    tag_rules maps a rule name to (tag names, attribute, compiled regex). Every
+    matching tag is kept in document order, like soup.find_all(...). Tag names
+    or attribute may be None to match any tag or skip the attribute check.
+    """
+
+    def __init__(self, soup, label_patterns, tag_rules):
+        self.soup = soup
+        self.labels = {}
+        self.matches = {name: [] for name in tag_rules}
+        self._texts = []
+        self._text = None
+
+        # A single alternation lets most text nodes be rejected with one search
+        any_label = re.compile(
+            '|'.join(f'(?:{pattern.pattern})' for pattern in label_patterns.values()),
+            re.IGNORECASE
+        ) if label_patterns else None
+        pending_labels = dict(label_patterns)
+
+        # Group tag rules by tag name so each tag only checks the rules that can apply
+        named_rules = {}
+        any_tag_rules = []
+        for name, (tag_names, attr, pattern) in tag_rules.items():
+            rule = (self.matches[name], attr, pattern)
+            if tag_names is None:
+                any_tag_rules.append(rule)
+                continue
+            if isinstance(tag_names, str):
+                tag_names = (tag_names,)
+            for tag_name in tag_names:
+                named_rules.setdefault(tag_name, []).append(rule)
+
+        for element in soup.descendants:
+            if isinstance(element, Tag):
+                attrs = element.attrs
+                for found, attr, pattern in named_rules.get(element.name, ()):
+                    if attr is None or (attr in attrs and self._attr_matches(attrs[attr], pattern)):
+                        found.append(element)
+                for found, attr, pattern in any_tag_rules:
+                    if attr is None or (attr in attrs and self._attr_matches(attrs[attr], pattern)):
+                        found.append(element)
+            else:
+                if type(element) in TEXT_TYPES:
+                    self._texts.append(element)
+                if pending_labels and any_label.search(element):
+                    for name, pattern in list(pending_labels.items()):
+                        if pattern.search(element):
+                            self.labels[name] = element
+                            del pending_labels[name]
+
+    @staticmethod
+    def _attr_matches(value, pattern):
+        """Match an attribute the way BeautifulSoup does for regex filters"""
+        if isinstance(value, str):
+            return pattern.search(value) is not None
+        # Multi-valued attributes such as class match on any value or the joined string
+        return any(pattern.search(item) for item in value) or pattern.search(' '.join(value)) is not None
+
+    def label(self, name):
+        """First text node matching the named label, or None"""
+        return self.labels.get(name)
+
+    def first(self, rule):
+        """First tag matching the named rule, or None"""
+        found = self.matches.get(rule)
+        return found[0] if found else None
+
+    def all(self, rule):
+        """All tags matching the named rule in document order"""
+        return self.matches.get(rule, [])
+
+    @property
+    def text(self):
+        """Same text as soup.get_text(), built from the strings seen during the walk"""
+        if self._text is None:
+            self._text = ''.join(self._texts)
+        return self._text
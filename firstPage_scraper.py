@@ -1,5 +1,3 @@
-import requests
-from bs4 import BeautifulSoup
 import json
 import time
 from datetime import datetime, timedelta
@@ -7,14 +5,73 @@ from urllib.parse import urljoin
 import re
 import csv
 
+from archive import ARCHIVE_DIR, CODECS, write_partition
+from cassette import CassetteAdapter
+from delta import DELTA_FILE, INDEX_FILE, write_delta
+from charset import response_html
+from field_index import FieldIndex
+from http_cache import HTTP_CACHE_DIR, CachingAdapter, source_version
+from job_schema import redate_job
+from parser_backend import ParserSelector
+from text_repair import repair_text
+from transport import make_transport
+
+# Label texts looked up on job detail pages - compiled once, matched in a single pass
+LABEL_PATTERNS = {
+    'urgent': re.compile(r'Vacante\s+Fresca|Urgente', re.IGNORECASE),
+    'description': re.compile(r'Funciones del Puesto|Descripción', re.IGNORECASE),
+    'category': re.compile(r'Área del Puesto', re.IGNORECASE),
+    'type': re.compile(r'Tiempo Completo|Tiempo Parcial', re.IGNORECASE),
+    'gender': re.compile(r'Género|Gender|Sexo', re.IGNORECASE),
+    'salary_any': re.compile(r'Salario|Salary', re.IGNORECASE),
+    'salary': re.compile(r'Salario', re.IGNORECASE),
+    'experience': re.compile(r'Experiencia', re.IGNORECASE),
+    'career_level': re.compile(r'Nivel de Cómputo|Career Level', re.IGNORECASE),
+    'qualification': re.compile(r'Nivel Académico', re.IGNORECASE),
+    'deadline': re.compile(r'Fecha\s+Límite|Deadline', re.IGNORECASE),
+    'location': re.compile(r'Ubicación del Puesto', re.IGNORECASE),
+}
+
+# Tags looked up on job detail pages: (tag names, attribute, pattern)
+TAG_RULES = {
+    'heading': (('h1', 'h2', 'h3'), None, None),
+    'image': ('img', None, None),
+    'logo_image': ('img', 'class', re.compile(r'logo|company', re.IGNORECASE)),
+    'featured_badge': (None, 'class', re.compile(r'featured|destacado', re.IGNORECASE)),
+    'video': ('iframe', 'src', re.compile(r'youtube|vimeo', re.IGNORECASE)),
+}
+
+VACANTE_FRESCA_PATTERN = re.compile(r'Vacante\s+Fresca', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+NUMBER_PATTERN = re.compile(r'\d+')
+
 class CostaRicaJobsScraper:
-    def __init__(self):
+    def __init__(self, parser=None, cache_dir=None, transport='requests', keep_alive=True,
+                 connect_timeout=10, read_timeout=30, cassette_dir=None, record=False):
         self.base_url = "https://empleos.net"
         self.search_url = "https://empleos.net/buscar_vacantes.php"
-        self.session = requests.Session()
-        self.session.headers.update({
+        headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        }
+        options = dict(pool_size=1, keep_alive=keep_alive, connect_timeout=connect_timeout,
+                       read_timeout=read_timeout, headers=headers)
+        # Revalidate pages from earlier runs instead of downloading them again,
+        # or record / replay every response with a cassette
+        self.http_cache = None
+        self.cassette = None
+        if cassette_dir and transport == 'requests':
+            self.cassette = CassetteAdapter(cassette_dir, record=record)
+            options['adapter'] = self.cassette
+        elif cache_dir and transport == 'requests':
+            self.http_cache = CachingAdapter(cache_dir)
+            options['adapter'] = self.http_cache
+            # Cached records are only reused by this scraper with this extraction code
+            self.record_key = 'first_page:' + source_version(type(self), FieldIndex, repair_text, response_html)
+        self.transport = make_transport(transport, **options)
+        # Replayed responses come from disk, so there is no need for the polite pauses
+        self.delay_scale = 0 if self.cassette and not record else 1
+        # Fastest installed parser, checked against html.parser on the first page
+        self.parsers = ParserSelector(parser)
         
     def get_job_listings_page(self):
         """Get job listings from first page only"""
@@ -26,11 +83,11 @@ class CostaRicaJobsScraper:
         
         try:
             print(f"\nFetching first page...")
-            response = self.session.get(self.search_url, params=params, timeout=30)
+            response = self.transport.get(self.search_url, params=params)
             response.raise_for_status()
             print(f"Response URL: {response.url}")
-            time.sleep(3)
-            return response.text
+            time.sleep(3 * self.delay_scale)
+            return response_html(response)
         except Exception as e:
             print(f"Error fetching page: {e}")
             return None
@@ -40,101 +97,107 @@ class CostaRicaJobsScraper:
         if not html:
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
+        job_urls = self.parsers.parse(html, 'listing', self._extract_job_urls)
+        print(f"Total unique URLs extracted: {len(job_urls)}")
+        return job_urls
+    
+    def _extract_job_urls(self, soup):
         job_urls = []
-        
-        job_links = soup.find_all('a', href=re.compile(r'/puesto/\d+'))
-        print(f"Found {len(job_links)} job links")
-        
-        for link in job_links:
+        for link in soup.find_all('a', href=re.compile(r'/puesto/\d+')):
             href = link.get('href')
             if href:
                 full_url = urljoin(self.base_url, href)
                 if full_url not in job_urls:
                     job_urls.append(full_url)
-        
-        print(f"Total unique URLs extracted: {len(job_urls)}")
         return job_urls
     
     def get_job_details(self, job_url):
         """Scrape detailed job information from individual job page"""
         try:
             print(f"  Fetching: {job_url}")
-            response = self.session.get(job_url, timeout=30)
+            response = self.transport.get(job_url)
             response.raise_for_status()
             
-            time.sleep(2)
+            # Same body as last run - reuse the job extracted from it
+            content_hash = getattr(response, 'content_hash', None)
+            if self.http_cache and content_hash:
+                job_data = self.http_cache.get_record(job_url, content_hash, self.record_key)
+                if job_data:
+                    print(f"  ↺ Unchanged since last run")
+                    return redate_job(job_data, self.calculate_expiry_date())
             
-            # Detect the actual encoding from the response
-            if response.encoding and response.encoding.lower() != 'utf-8':
-                # If site declares non-UTF-8, decode using that then re-encode to UTF-8
-                soup = BeautifulSoup(response.content, 'html.parser')
-            else:
-                # Otherwise use the text as-is
-                soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract location first as it's used for address and map_location
-            location_value = self.extract_location(soup)
-            
-            job_data = {
-                '_job_featured_image': self.extract_featured_image(soup),
-                '_job_title': self.extract_title(soup),
-                '_job_featured': self.is_featured(soup),
-                '_job_filled': 0,
-                '_job_urgent': self.is_urgent(soup),
-                '_job_description': self.extract_description(soup),
-                '_job_category': self.extract_category(soup),
-                '_job_type': self.extract_type(soup),
-                '_job_tag': 'Costa Rica',
-                '_job_expiry_date': self.calculate_expiry_date(),
-                '_job_gender': self.extract_gender(soup),
-                '_job_apply_type': 'external',
-                '_job_apply_url': job_url,
-                '_job_apply_email': self.extract_email(soup),
-                '_job_salary_type': self.extract_salary_type(soup),
-                '_job_salary': self.extract_salary(soup),
-                '_job_max_salary': self.extract_salary(soup),
-                '_job_experience': self.extract_experience(soup),
-                '_job_career_level': self.extract_career_level(soup),
-                '_job_qualification': self.extract_qualification(soup),
-                '_job_video_url': self.extract_video(soup),
-                '_job_photos': self.extract_photos(soup),
-                '_job_application_deadline_date': self.extract_deadline(soup),
-                '_job_address': location_value,
-                '_job_location': location_value,
-                '_job_map_location': location_value
-            }
+            time.sleep(2 * self.delay_scale)
             
+            job_data = self.parsers.parse(response_html(response), 'detail', lambda soup: self.extract_job_data(soup, job_url))
+            if self.http_cache and content_hash:
+                self.http_cache.store_record(job_url, content_hash, job_data, self.record_key)
             return job_data
             
         except Exception as e:
             print(f"  ✗ Error getting job details: {e}")
             return None
     
-    def extract_featured_image(self, soup):
-        img = soup.find('img', class_=re.compile(r'logo|company', re.IGNORECASE))
+    def extract_job_data(self, soup, job_url):
+        # Walk the page once; every extractor reads from this index
+        index = FieldIndex(soup, LABEL_PATTERNS, TAG_RULES)
+        
+        # Extract location first as it's used for address and map_location
+        location_value = self.extract_location(index)
+        salary = self.extract_salary(index)
+        
+        return {
+            '_job_featured_image': self.extract_featured_image(index),
+            '_job_title': self.extract_title(index),
+            '_job_featured': self.is_featured(index),
+            '_job_filled': 0,
+            '_job_urgent': self.is_urgent(index),
+            '_job_description': self.extract_description(index),
+            '_job_category': self.extract_category(index),
+            '_job_type': self.extract_type(index),
+            '_job_tag': 'Costa Rica',
+            '_job_expiry_date': self.calculate_expiry_date(),
+            '_job_gender': self.extract_gender(index),
+            '_job_apply_type': 'external',
+            '_job_apply_url': job_url,
+            '_job_apply_email': self.extract_email(index),
+            '_job_salary_type': self.extract_salary_type(index),
+            '_job_salary': salary,
+            '_job_max_salary': salary,
+            '_job_experience': self.extract_experience(index),
+            '_job_career_level': self.extract_career_level(index),
+            '_job_qualification': self.extract_qualification(index),
+            '_job_video_url': self.extract_video(index),
+            '_job_photos': self.extract_photos(index),
+            '_job_application_deadline_date': self.extract_deadline(index),
+            '_job_address': location_value,
+            '_job_location': location_value,
+            '_job_map_location': location_value
+        }
+    
+    def extract_featured_image(self, index):
+        img = index.first('logo_image')
         if img and img.get('src'):
             return urljoin(self.base_url, img['src'])
         return ''
     
-    def extract_title(self, soup):
-        for heading in soup.find_all(['h1', 'h2', 'h3']):
+    def extract_title(self, index):
+        for heading in index.all('heading'):
             text = heading.get_text(strip=True)
-            text = re.sub(r'Vacante\s+Fresca', '', text, flags=re.IGNORECASE).strip()
+            text = VACANTE_FRESCA_PATTERN.sub('', text).strip()
             if text and len(text) > 2:
                 return self.clean_text(text)
         return ''
     
-    def is_featured(self, soup):
-        featured_badge = soup.find(class_=re.compile(r'featured|destacado', re.IGNORECASE))
+    def is_featured(self, index):
+        featured_badge = index.first('featured_badge')
         return 1 if featured_badge else 0
     
-    def is_urgent(self, soup):
-        urgent_badge = soup.find(text=re.compile(r'Vacante\s+Fresca|Urgente', re.IGNORECASE))
+    def is_urgent(self, index):
+        urgent_badge = index.label('urgent')
         return 1 if urgent_badge else 0
     
-    def extract_description(self, soup):
-        desc_section = soup.find(text=re.compile(r'Funciones del Puesto|Descripción', re.IGNORECASE))
+    def extract_description(self, index):
+        desc_section = index.label('description')
         if desc_section:
             parent = desc_section.find_parent()
             if parent:
@@ -144,40 +207,11 @@ class CostaRicaJobsScraper:
         return ''
     
     def clean_text(self, text):
-        """Clean and fix encoding issues - only fix the � symbol, keep original text"""
-        if not text:
-            return ''
-        
-        # Only replace the � replacement character that appears due to encoding mismatch
-        # Map common Spanish accented characters that become �
-        text = text.replace('�', 'ó')  # Most common case
-        
-        # If still has issues, try these specific patterns
-        if '�' in text:
-            # Try to detect what the � should be based on context
-            text = text.replace('descripci�n', 'descripción')
-            text = text.replace('Descripci�n', 'Descripción')
-            text = text.replace('importaci�n', 'importación')
-            text = text.replace('exportaci�n', 'exportación')
-            text = text.replace('actuaci�n', 'actuación')
-            text = text.replace('operaci�n', 'operación')
-            text = text.replace('Corporaci�n', 'Corporación')
-            text = text.replace('revisi�n', 'revisión')
-            text = text.replace('Elaboraci�n', 'Elaboración')
-            text = text.replace('t�cnico', 'técnico')
-            text = text.replace('tem�tica', 'temática')
-            text = text.replace('Acad�mico', 'Académico')
-            text = text.replace('asesor�a', 'asesoría')
-            text = text.replace('estad�stica', 'estadística')
-            text = text.replace('�rea', 'Área')
-            text = text.replace('Ubicaci�n', 'Ubicación')
-            text = text.replace('as�', 'así')
-            text = text.replace('G�nero', 'Género')
-        
-        return text.strip()
+        """Fix mangled Spanish accents (see text_repair.py) and strip whitespace"""
+        return repair_text(text)
     
-    def extract_category(self, soup):
-        area_label = soup.find(text=re.compile(r'Área del Puesto', re.IGNORECASE))
+    def extract_category(self, index):
+        area_label = index.label('category')
         if area_label:
             parent = area_label.find_parent()
             if parent:
@@ -186,8 +220,8 @@ class CostaRicaJobsScraper:
                     return self.clean_text(value_elem.get_text(strip=True))
         return ''
     
-    def extract_type(self, soup):
-        type_text = soup.find(text=re.compile(r'Tiempo Completo|Tiempo Parcial', re.IGNORECASE))
+    def extract_type(self, index):
+        type_text = index.label('type')
         if type_text:
             text = str(type_text).lower()
             if 'completo' in text:
@@ -200,8 +234,8 @@ class CostaRicaJobsScraper:
         expiry = datetime.now() + timedelta(days=90)
         return expiry.strftime('%Y-%m-%d')
     
-    def extract_gender(self, soup):
-        gender_text = soup.find(text=re.compile(r'Género|Gender|Sexo', re.IGNORECASE))
+    def extract_gender(self, index):
+        gender_text = index.label('gender')
         if gender_text:
             parent = gender_text.find_parent()
             if parent:
@@ -214,12 +248,12 @@ class CostaRicaJobsScraper:
                         return 'Femenino'
         return 'Indistinto'
     
-    def extract_email(self, soup):
-        emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', soup.get_text())
-        return emails[0] if emails else ''
+    def extract_email(self, index):
+        email = EMAIL_PATTERN.search(index.text)
+        return email.group(0) if email else ''
     
-    def extract_salary_type(self, soup):
-        salary_text = soup.find(text=re.compile(r'Salario|Salary', re.IGNORECASE))
+    def extract_salary_type(self, index):
+        salary_text = index.label('salary_any')
         if salary_text:
             text = str(salary_text.parent.get_text(strip=True)).lower()
             if 'mensual' in text:
@@ -228,21 +262,21 @@ class CostaRicaJobsScraper:
                 return 'Anual'
         return 'Mensual'
     
-    def extract_salary(self, soup):
-        salary_label = soup.find(text=re.compile(r'Salario', re.IGNORECASE))
+    def extract_salary(self, index):
+        salary_label = index.label('salary')
         if salary_label:
             parent = salary_label.find_parent()
             if parent:
                 salary_section = parent.find_next_sibling() or parent.parent
                 if salary_section:
                     text = salary_section.get_text()
-                    numbers = re.findall(r'\d+', text.replace(',', ''))
+                    numbers = NUMBER_PATTERN.findall(text.replace(',', ''))
                     if numbers:
                         return numbers[0]
         return ''
     
-    def extract_experience(self, soup):
-        exp_text = soup.find(text=re.compile(r'Experiencia', re.IGNORECASE))
+    def extract_experience(self, index):
+        exp_text = index.label('experience')
         if exp_text:
             parent = exp_text.find_parent()
             if parent:
@@ -251,8 +285,8 @@ class CostaRicaJobsScraper:
                     return self.clean_text(value.get_text(strip=True))
         return ''
     
-    def extract_career_level(self, soup):
-        level_text = soup.find(text=re.compile(r'Nivel de Cómputo|Career Level', re.IGNORECASE))
+    def extract_career_level(self, index):
+        level_text = index.label('career_level')
         if level_text:
             parent = level_text.find_parent()
             if parent:
@@ -261,8 +295,8 @@ class CostaRicaJobsScraper:
                     return self.clean_text(value.get_text(strip=True))
         return ''
     
-    def extract_qualification(self, soup):
-        qual_label = soup.find(text=re.compile(r'Nivel Académico', re.IGNORECASE))
+    def extract_qualification(self, index):
+        qual_label = index.label('qualification')
         if qual_label:
             parent = qual_label.find_parent()
             if parent:
@@ -271,20 +305,20 @@ class CostaRicaJobsScraper:
                     return self.clean_text(value_elem.get_text(strip=True))
         return ''
     
-    def extract_video(self, soup):
-        video = soup.find('iframe', src=re.compile(r'youtube|vimeo', re.IGNORECASE))
+    def extract_video(self, index):
+        video = index.first('video')
         return video['src'] if video else ''
     
-    def extract_photos(self, soup):
+    def extract_photos(self, index):
         photos = []
-        for img in soup.find_all('img'):
+        for img in index.all('image'):
             src = img.get('src', '')
             if src and 'logo' not in src.lower():
                 photos.append(urljoin(self.base_url, src))
         return ','.join(photos[:5])
     
-    def extract_deadline(self, soup):
-        deadline_text = soup.find(text=re.compile(r'Fecha\s+Límite|Deadline', re.IGNORECASE))
+    def extract_deadline(self, index):
+        deadline_text = index.label('deadline')
         if deadline_text:
             parent = deadline_text.find_parent()
             if parent:
@@ -298,8 +332,8 @@ class CostaRicaJobsScraper:
                         pass
         return self.calculate_expiry_date()
     
-    def extract_location(self, soup):
-        loc_label = soup.find(text=re.compile(r'Ubicación del Puesto', re.IGNORECASE))
+    def extract_location(self, index):
+        loc_label = index.label('location')
         if loc_label:
             parent = loc_label.find_parent()
             if parent:
@@ -331,7 +365,7 @@ class CostaRicaJobsScraper:
             if job_data:
                 all_jobs.append(job_data)
                 print(f"  ✓ Scraped: {job_data['_job_title']}")
-            time.sleep(2)
+            time.sleep(2 * self.delay_scale)
         
         return all_jobs
     
@@ -351,16 +385,49 @@ class CostaRicaJobsScraper:
 
 
 if __name__ == "__main__":
-    scraper = CostaRicaJobsScraper()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Scrape the first page of Costa Rica job listings from empleos.net")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='DIR',
+                          help="save every response to a cassette directory while scraping")
+    cassette.add_argument('--replay', metavar='DIR',
+                          help="serve every response from a recorded cassette, without network access")
+    parser.add_argument('--archive', nargs='?', const=ARCHIVE_DIR, metavar='DIR',
+                        help=f"also write the jobs as compressed NDJSON partitioned by date under DIR "
+                             f"(default {ARCHIVE_DIR}), listed in DIR/manifest.json")
+    parser.add_argument('--compression', choices=list(CODECS), default='gzip',
+                        help="archive compression (zstd needs the zstandard package)")
+    parser.add_argument('--delta', action='store_true',
+                        help=f"also write the jobs added, changed and removed since the last run to {DELTA_FILE} "
+                             f"(the last run is remembered in {INDEX_FILE}); only the first page is "
+                             f"compared, so removed means no longer on the first page")
+    parser.add_argument('--delta-only', action='store_true',
+                        help="write the delta instead of the full costa_rica_jobs.json / .csv")
+    args = parser.parse_args()
+    
+    scraper = CostaRicaJobsScraper(cache_dir=HTTP_CACHE_DIR, cassette_dir=args.record or args.replay,
+                                   record=bool(args.record))
     jobs = scraper.scrape_first_page()
     
     print("\n" + "="*60)
     print("SCRAPING COMPLETE")
     print("="*60)
+    if scraper.http_cache:
+        print(scraper.http_cache.summary())
+    if scraper.cassette:
+        print(scraper.cassette.summary())
     
     if jobs:
-        scraper.save_to_json(jobs)
-        scraper.save_to_csv(jobs)
+        if args.delta or args.delta_only:
+            # Before the first index exists, the last full export is the previous run.
+            # Only page 1 is scraped, so "removed" jobs may just have moved to page 2
+            write_delta(jobs, snapshot='costa_rica_jobs.json')
+        if not args.delta_only:
+            scraper.save_to_json(jobs)
+            scraper.save_to_csv(jobs)
+        if args.archive:
+            write_partition(jobs, args.archive, 'first_page', args.compression)
         print(f"\n✅ Successfully scraped {len(jobs)} jobs from first page!")
         print(f"Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     else:
@@ -0,0 +1,225 @@
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+HTTP_CACHE_DIR = '.http_cache'
+
+# The stored body is already decoded, so these no longer describe it
+SKIP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def source_version(*objects):
+    """Short hash of the source files defining objects (classes, functions), for record keys that change with the code"""
+    digest = hashlib.sha256()
+    for path in sorted({inspect.getsourcefile(obj) for obj in objects}):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that keeps GET responses on disk and revalidates them
+
+    Every 200 response is stored with its headers, ETag / Last-Modified and a
+    hash of the body. A later request for the same URL is sent with
+    If-None-Match / If-Modified-Since and a 304 is answered from disk.
+    Responses younger than fresh_for seconds are served without any request.
+    Entries not revalidated for ttl seconds are evicted, and the least
+    recently used entries go once the cache is larger than max_bytes.
+
+    Every response gets a content_hash attribute, plus from_cache when it was
+    served from disk. The cache can also keep the job extracted from a body
+    (see get_record / store_record) so unchanged pages are not parsed again.
+    Records are kept per key, one for each scraper and version of its
+    extraction code, so scrapers never get each other's records and a
+    change to the extractors is not hidden behind records made by the old code.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, ttl=7 * 24 * 3600, max_bytes=200 * 1024 * 1024,
+                 fresh_for=0, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stored_since_evict = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.evict()
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def _load_meta(self, url):
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta['stored_at'] > self.ttl:
+            return None
+        return meta
+
+    def _load(self, url):
+        meta = self._load_meta(url)
+        if not meta:
+            return None, None
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except OSError:
+            return None, None
+
+    def _write_meta(self, url, meta):
+        meta_path, _ = self._paths(url)
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def _store(self, url, response):
+        body = response.content
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in SKIP_HEADERS},
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': hashlib.sha256(body).hexdigest(),
+            'stored_at': time.time(),
+        }
+        # Keep the extracted record while the body is unchanged
+        previous = self._load_meta(url)
+        if previous and previous.get('content_hash') == meta['content_hash'] and previous.get('records'):
+            meta['records'] = previous['records']
+
+        _, body_path = self._paths(url)
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, body_path)
+        self._write_meta(url, meta)
+        return meta
+
+    def _cached_response(self, request, meta, body):
+        response = Response()
+        response.status_code = meta['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        response.content_hash = meta['content_hash']
+        return response
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        url = request.url
+        meta, body = self._load(url)
+        if meta and time.time() - meta['stored_at'] < self.fresh_for:
+            with self.lock:
+                self.hits += 1
+            return self._cached_response(request, meta, body)
+
+        if meta:
+            if meta.get('etag'):
+                request.headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request.headers['If-Modified-Since'] = meta['last_modified']
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and meta:
+            response.close()
+            meta['stored_at'] = time.time()
+            self._write_meta(url, meta)
+            with self.lock:
+                self.revalidated += 1
+            return self._cached_response(request, meta, body)
+
+        with self.lock:
+            self.misses += 1
+        if response.status_code == 200:
+            meta = self._store(url, response)
+            response.content_hash = meta['content_hash']
+            with self.lock:
+                self.stored_since_evict += 1
+                due = self.stored_since_evict >= 50
+                if due:
+                    self.stored_since_evict = 0
+            # Outside the lock: the directory scan must not hold up the other fetch threads
+            if due:
+                self.evict()
+        response.from_cache = False
+        return response
+
+    def get_record(self, url, content_hash, key):
+        """Return the record stored under key for this exact body on an earlier run, or None"""
+        meta = self._load_meta(url)
+        if meta and meta.get('content_hash') == content_hash:
+            return meta.get('records', {}).get(key)
+        return None
+
+    def store_record(self, url, content_hash, record, key):
+        """Remember the job extracted from a cached body under key ('<scraper>:<version>')
+
+        Records of older versions of the same scraper are dropped.
+        """
+        meta = self._load_meta(url)
+        if meta and meta.get('content_hash') == content_hash:
+            scraper = key.split(':', 1)[0]
+            records = {k: v for k, v in meta.get('records', {}).items() if k.split(':', 1)[0] != scraper}
+            records[key] = record
+            meta['records'] = records
+            self._write_meta(url, meta)
+
+    def evict(self):
+        """Drop expired entries, then the least recently revalidated ones until under max_bytes"""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            body_path = meta_path[:-len('.json')] + '.body'
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    stored_at = json.load(f)['stored_at']
+                size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+            except (OSError, ValueError, KeyError):
+                stored_at, size = 0, 0
+            entries.append((stored_at, size, meta_path, body_path))
+
+        entries.sort()
+        total = sum(size for _, size, _, _ in entries)
+        for stored_at, size, meta_path, body_path in entries:
+            if now - stored_at <= self.ttl and total <= self.max_bytes:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    def summary(self):
+        return f"cache hits: {self.hits}, revalidated (304): {self.revalidated}, downloaded: {self.misses}"
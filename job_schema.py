@@ -0,0 +1,180 @@
+import re
+import sys
+from collections.abc import Mapping
+
+# Every job record has exactly these keys, in this order (JSON, CSV and SQLite columns)
+JOB_FIELDS = [
+    '_job_featured_image',
+    '_job_title',
+    '_job_featured',
+    '_job_filled',
+    '_job_urgent',
+    '_job_description',
+    '_job_category',
+    '_job_type',
+    '_job_tag',
+    '_job_expiry_date',
+    '_job_gender',
+    '_job_apply_type',
+    '_job_apply_url',
+    '_job_apply_email',
+    '_job_salary_type',
+    '_job_salary',
+    '_job_max_salary',
+    '_job_experience',
+    '_job_career_level',
+    '_job_qualification',
+    '_job_video_url',
+    '_job_photos',
+    '_job_application_deadline_date',
+    '_job_address',
+    '_job_location',
+    '_job_map_location',
+]
+
+# 1/0 flags - everything else is text
+INTEGER_FIELDS = {'_job_featured', '_job_filled', '_job_urgent'}
+
+# Fields a JobRecord does not store: constants, and copies of another field
+CONSTANT_FIELDS = {'_job_tag': 'Costa Rica', '_job_apply_type': 'external'}
+COPIED_FIELDS = {'_job_max_salary': '_job_salary', '_job_address': '_job_location', '_job_map_location': '_job_location'}
+STORED_FIELDS = [field for field in JOB_FIELDS if field not in CONSTANT_FIELDS and field not in COPIED_FIELDS]
+
+# Short values repeated across many jobs, shared between records with sys.intern
+INTERNED_FIELDS = {
+    '_job_category', '_job_type', '_job_expiry_date', '_job_gender', '_job_salary_type', '_job_salary',
+    '_job_experience', '_job_career_level', '_job_qualification', '_job_application_deadline_date',
+    '_job_location',
+}
+
+JOB_ID_PATTERN = re.compile(r'/puesto/(\d+)')
+
+
+def extract_job_id(url):
+    """Return the numeric ID from a /puesto/<id> URL, or None"""
+    match = JOB_ID_PATTERN.search(url or '')
+    return match.group(1) if match else None
+
+
+def check_job_fields(fields):
+    """Raise ValueError if fields names anything that is not a job field"""
+    unknown = set(fields) - set(JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+
+
+class LazyJobRecord(Mapping):
+    """Read-only job record that extracts each field on first access and keeps it
+
+    extractors maps every field name to a function of no arguments. Only the
+    fields that are read get extracted, so a pass that only needs the ID and
+    title never pays for the description, email or photos. to_dict() extracts
+    whatever is left and returns the same plain dict as the eager extraction.
+    """
+
+    def __init__(self, extractors):
+        self._extractors = extractors
+        self._values = {}
+
+    def __getitem__(self, field):
+        try:
+            return self._values[field]
+        except KeyError:
+            value = self._values[field] = self._extractors[field]()
+            return value
+
+    def __iter__(self):
+        return iter(self._extractors)
+
+    def __len__(self):
+        return len(self._extractors)
+
+    def __repr__(self):
+        return f"LazyJobRecord({self._values!r}, pending={len(self._extractors) - len(self._values)})"
+
+    @property
+    def job_id(self):
+        return extract_job_id(self['_job_apply_url'])
+
+    def to_dict(self):
+        return {field: self[field] for field in self._extractors}
+
+
+class JobRecord(Mapping):
+    """One scraped job, stored in slots instead of a 26-key dict
+
+    Only STORED_FIELDS are kept, and repeated short values (category,
+    location, type...) are interned so records share them. The constant
+    fields and the copies of salary and location are filled in on output.
+    Reading record['_job_title'] works like the dict did, and to_dict()
+    returns the exact _job_* dict, with the same keys, order and values.
+    """
+
+    __slots__ = tuple(field[len('_job_'):] for field in STORED_FIELDS)
+
+    @classmethod
+    def from_dict(cls, job):
+        """Record from a _job_* dict; ValueError if its constant or copied fields do not fit"""
+        for field, value in CONSTANT_FIELDS.items():
+            if job.get(field, value) != value:
+                raise ValueError(f"{field} must be {value!r}, got {job[field]!r}")
+        for field, source in COPIED_FIELDS.items():
+            if field in job and job[field] != job.get(source):
+                raise ValueError(f"{field} must equal {source}")
+        record = cls.__new__(cls)
+        for slot, field in zip(cls.__slots__, STORED_FIELDS):
+            value = job.get(field, '')
+            if field in INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(record, slot, value)
+        return record
+
+    def __getitem__(self, field):
+        if field in CONSTANT_FIELDS:
+            return CONSTANT_FIELDS[field]
+        field = COPIED_FIELDS.get(field, field)
+        if not field.startswith('_job_') or field not in JOB_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field[len('_job_'):])
+
+    def __iter__(self):
+        return iter(JOB_FIELDS)
+
+    def __len__(self):
+        return len(JOB_FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, JobRecord):
+            return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"JobRecord({self.title!r}, {self.apply_url!r})"
+
+    @property
+    def job_id(self):
+        return extract_job_id(self.apply_url)
+
+    def to_dict(self):
+        return {field: self[field] for field in JOB_FIELDS}
+
+
+def has_fallback_deadline(job):
+    """True when the deadline is the expiry date the extractors fall back to for pages without one"""
+    return job.get('_job_application_deadline_date') == job.get('_job_expiry_date')
+
+
+def redate_job(job, expiry_date):
+    """Copy of a _job_* dict with its scrape-date fields (expiry, fallback deadline) set to expiry_date"""
+    job = dict(job)
+    if has_fallback_deadline(job):
+        job['_job_application_deadline_date'] = expiry_date
+    job['_job_expiry_date'] = expiry_date
+    return job
+
+
+def job_dict(job):
+    """Plain _job_* dict of a JobRecord, LazyJobRecord or dict"""
+    return job if isinstance(job, dict) else job.to_dict()
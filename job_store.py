@@ -0,0 +1,128 @@
+import csv
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from job_schema import INTEGER_FIELDS, JOB_FIELDS, extract_job_id
+
+JOB_STORE_FILE = 'costa_rica_jobs.db'
+
+# Columns people filter on - the rest are stored but not indexed
+INDEXED_FIELDS = [
+    '_job_title',
+    '_job_category',
+    '_job_type',
+    '_job_location',
+    '_job_application_deadline_date',
+    '_job_expiry_date',
+]
+
+
+class JobStore:
+    """SQLite store of every job ever scraped, keyed by the /puesto/<id> job ID
+
+    upsert() inserts new jobs and refreshes known ones in place, so an update
+    costs O(new jobs). first_seen / last_seen record when a job was first and
+    most recently scraped. export_json / export_csv write the classic
+    costa_rica_jobs_full.* files on demand.
+    """
+
+    def __init__(self, path=JOB_STORE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        columns = ', '.join(
+            f'{field} {"INTEGER" if field in INTEGER_FIELDS else "TEXT"}' for field in JOB_FIELDS
+        )
+        self.conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                {columns}
+            )
+        ''')
+        for field in INDEXED_FIELDS:
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS idx{field} ON jobs ({field})')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_last_seen ON jobs (last_seen)')
+        self.conn.commit()
+
+    def __contains__(self, job_id):
+        row = self.conn.execute('SELECT 1 FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def upsert(self, jobs, seen_at=None):
+        """Insert or refresh jobs, return how many were new"""
+        seen_at = seen_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = []
+        for job in jobs:
+            job_id = extract_job_id(job.get('_job_apply_url'))
+            if job_id:
+                rows.append([job_id, seen_at, seen_at] + [job.get(field, '') for field in JOB_FIELDS])
+        if not rows:
+            return 0
+
+        # Look up only this batch's IDs to count the new ones
+        batch_ids = {row[0] for row in rows}
+        known = set()
+        id_list = list(batch_ids)
+        for start in range(0, len(id_list), 500):
+            chunk = id_list[start:start + 500]
+            query = f'SELECT job_id FROM jobs WHERE job_id IN ({", ".join(["?"] * len(chunk))})'
+            known.update(row[0] for row in self.conn.execute(query, chunk))
+
+        placeholders = ', '.join(['?'] * (len(JOB_FIELDS) + 3))
+        updates = ', '.join(f'{field} = excluded.{field}' for field in JOB_FIELDS)
+        with self.conn:
+            self.conn.executemany(f'''
+                INSERT INTO jobs (job_id, first_seen, last_seen, {', '.join(JOB_FIELDS)})
+                VALUES ({placeholders})
+                ON CONFLICT(job_id) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    {updates}
+            ''', rows)
+        return len(batch_ids - known)
+
+    def iter_jobs(self):
+        """Yield jobs as _job_* dicts in the order they were first seen"""
+        cursor = self.conn.execute(f'SELECT {", ".join(JOB_FIELDS)} FROM jobs ORDER BY first_seen, rowid')
+        for row in cursor:
+            yield dict(zip(JOB_FIELDS, row))
+
+    def import_json(self, filename):
+        """Load an existing JSON export (e.g. costa_rica_jobs_full.json) into the store"""
+        if not os.path.exists(filename):
+            return 0
+        with open(filename, 'r', encoding='utf-8') as f:
+            jobs = json.load(f)
+        added = self.upsert(jobs)
+        print(f"Imported {added} jobs from {filename}")
+        return added
+
+    def export_json(self, filename='costa_rica_jobs_full.json'):
+        """Write the same indented JSON array as save_to_json, one job at a time"""
+        count = 0
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for job in self.iter_jobs():
+                record = json.dumps(job, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+                f.write((',\n  ' if count else '\n  ') + record)
+                count += 1
+            f.write('\n]' if count else ']')
+        print(f"✓ Exported {count} jobs to {filename}")
+
+    def export_csv(self, filename='costa_rica_jobs_full.csv'):
+        count = 0
+        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=JOB_FIELDS)
+            writer.writeheader()
+            for job in self.iter_jobs():
+                writer.writerow(job)
+                count += 1
+        print(f"✓ Exported {count} jobs to {filename}")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,40 @@
+import html
+import re
+from urllib.parse import urljoin
+
+# href of an <a> tag pointing at a job, quoted with " or ' or bare
+JOB_LINK_PATTERN = re.compile(
+    r'''<a(?:\s[^>]*?)?\shref\s*=\s*(?:"([^"]*/puesto/(\d+)[^"]*)"|'([^']*/puesto/(\d+)[^']*)'|([^\s"'>]*/puesto/(\d+)[^\s"'>]*))''',
+    re.IGNORECASE)
+
+# Page number of a pagination link to another listings page
+PAGE_LINK_PATTERN = re.compile(r'[?&;]pagelocales=(\d+)', re.IGNORECASE)
+
+
+def scan_job_links(markup, base_url):
+    """Return {job_id: url} for the job links of a listings page, in page order, without building a soup
+
+    One regex pass over the raw HTML. Each ID keeps the URL of its first link,
+    made absolute against base_url like urljoin on the parsed href would.
+    """
+    links = {}
+    for match in JOB_LINK_PATTERN.finditer(markup):
+        job_id = match.group(2) or match.group(4) or match.group(6)
+        if job_id in links:
+            continue
+        href = match.group(1) or match.group(3) or match.group(5)
+        if '&' in href:
+            href = html.unescape(href)
+        links[job_id] = urljoin(base_url, href)
+    return links
+
+
+def scan_job_ids(markup):
+    """Ordered unique job IDs linked from a listings page"""
+    return list(scan_job_links(markup, ''))
+
+
+def scan_last_page(markup):
+    """Highest page number linked from the pagination of a listings page, or None"""
+    pages = PAGE_LINK_PATTERN.findall(markup)
+    return max(map(int, pages)) if pages else None
@@ -0,0 +1,164 @@
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# Request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = 'job_scraper'
+
+
+class CrawlMetrics:
+    """Counters and latency histograms for one crawl, written as a Prometheus textfile and a JSON summary
+
+    Request latency is kept per page kind (listing / detail). The other
+    metrics are bytes downloaded, jobs scraped, errors by type, cache hits
+    and time spent sleeping (rate limiting and retry backoff). With a path,
+    maybe_write() rewrites <path>.prom (for the node_exporter textfile
+    collector) and <path>.json at most every write_interval seconds, and
+    write() does it right away. Both files are replaced atomically.
+    """
+
+    def __init__(self, path=None, write_interval=30.0):
+        self.path = path
+        self.write_interval = write_interval
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.written_at = 0.0
+        self.latency = {}
+        self.bytes_downloaded = 0
+        self.jobs = 0
+        self.pages = 0
+        self.errors = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.sleep_seconds = 0.0
+        self.request_rate = None
+        self.complete = False
+
+    def observe_request(self, kind, seconds, size=0, from_cache=None):
+        with self.lock:
+            buckets = self.latency.setdefault(kind, {'counts': [0] * (len(LATENCY_BUCKETS) + 1),
+                                                     'sum': 0.0, 'count': 0})
+            buckets['counts'][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            buckets['sum'] += seconds
+            buckets['count'] += 1
+            if from_cache:
+                self.cache_hits += 1
+            else:
+                self.bytes_downloaded += size
+                if from_cache is not None:
+                    self.cache_misses += 1
+
+    def error(self, error_type):
+        with self.lock:
+            self.errors[error_type] = self.errors.get(error_type, 0) + 1
+
+    def slept(self, seconds):
+        with self.lock:
+            self.sleep_seconds += seconds
+
+    def job_scraped(self):
+        with self.lock:
+            self.jobs += 1
+
+    def page_done(self):
+        with self.lock:
+            self.pages += 1
+
+    def summary(self):
+        """Current values as a JSON-ready dict"""
+        with self.lock:
+            elapsed = time.time() - self.started_at
+            cache_total = self.cache_hits + self.cache_misses
+            requests = {}
+            for kind, data in self.latency.items():
+                cumulative, total = [], 0
+                for count in data['counts']:
+                    total += count
+                    cumulative.append(total)
+                requests[kind] = {
+                    'count': data['count'],
+                    'seconds_total': round(data['sum'], 3),
+                    'seconds_mean': round(data['sum'] / data['count'], 3) if data['count'] else 0.0,
+                    'buckets': dict(zip([str(b) for b in LATENCY_BUCKETS] + ['+Inf'], cumulative)),
+                }
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at).strftime('%Y-%m-%d %H:%M:%S'),
+                'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'elapsed_seconds': round(elapsed, 1),
+                'complete': self.complete,
+                'pages': self.pages,
+                'jobs': self.jobs,
+                'jobs_per_minute': round(self.jobs / elapsed * 60, 2) if elapsed else 0.0,
+                'requests': requests,
+                'bytes_downloaded': self.bytes_downloaded,
+                'errors': dict(self.errors),
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'cache_hit_ratio': round(self.cache_hits / cache_total, 3) if cache_total else None,
+                'sleep_seconds': round(self.sleep_seconds, 2),
+                'request_rate': self.request_rate,
+            }
+
+    def prometheus(self):
+        """Current values in the Prometheus text exposition format"""
+        summary = self.summary()
+        p = METRIC_PREFIX
+        lines = [
+            f'# HELP {p}_request_duration_seconds Time to fetch a listing or detail page.',
+            f'# TYPE {p}_request_duration_seconds histogram',
+        ]
+        for kind, data in summary['requests'].items():
+            for le, count in data['buckets'].items():
+                lines.append(f'{p}_request_duration_seconds_bucket{{kind="{kind}",le="{le}"}} {count}')
+            lines.append(f'{p}_request_duration_seconds_sum{{kind="{kind}"}} {data["seconds_total"]}')
+            lines.append(f'{p}_request_duration_seconds_count{{kind="{kind}"}} {data["count"]}')
+
+        lines += [
+            f'# HELP {p}_errors_total Failed requests and extractions by error type.',
+            f'# TYPE {p}_errors_total counter',
+        ]
+        lines += [f'{p}_errors_total{{type="{error_type}"}} {count}'
+                  for error_type, count in sorted(summary['errors'].items())]
+
+        for name, metric_type, value, help_text in (
+            ('downloaded_bytes_total', 'counter', summary['bytes_downloaded'], 'Response bytes downloaded.'),
+            ('jobs_scraped_total', 'counter', summary['jobs'], 'Jobs scraped in this crawl.'),
+            ('pages_total', 'counter', summary['pages'], 'Listing pages processed in this crawl.'),
+            ('jobs_per_minute', 'gauge', summary['jobs_per_minute'], 'Jobs scraped per minute.'),
+            ('cache_hits_total', 'counter', summary['cache_hits'], 'Responses answered from the HTTP cache.'),
+            ('cache_hit_ratio', 'gauge', summary['cache_hit_ratio'], 'Share of responses answered from the HTTP cache.'),
+            ('sleep_seconds_total', 'counter', summary['sleep_seconds'], 'Time spent waiting on rate limits and backoff.'),
+            ('request_rate', 'gauge', summary['request_rate'], 'Current allowed requests per second.'),
+            ('crawl_duration_seconds', 'gauge', summary['elapsed_seconds'], 'Time since the crawl started.'),
+            ('crawl_complete', 'gauge', int(summary['complete']), 'Whether the crawl finished.'),
+            ('last_update_timestamp_seconds', 'gauge', round(time.time()), 'When these metrics were written.'),
+        ):
+            if value is None:
+                continue
+            lines += [f'# HELP {p}_{name} {help_text}', f'# TYPE {p}_{name} {metric_type}', f'{p}_{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+    def maybe_write(self):
+        if self.path and time.time() - self.written_at >= self.write_interval:
+            self.write()
+
+    def write(self):
+        """Write <path>.prom and <path>.json now"""
+        if not self.path:
+            return
+        self.written_at = time.time()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        for extension, content in (('.prom', self.prometheus()),
+                                   ('.json', json.dumps(self.summary(), indent=2))):
+            target = self.path + extension
+            tmp_path = f"{target}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, target)
@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from charset import decode_html
+
+# Set in each worker process by _init_worker
+_worker_scraper = None
+
+
+def _init_worker(options):
+    global _worker_scraper
+    # Imported here, two_page_scraper imports this module
+    from two_page_scraper import CostaRicaJobsScraper
+    _worker_scraper = CostaRicaJobsScraper(workers=1, prefetch_pages=0, adaptive=False, **options)
+
+
+def _parse_page(page):
+    job_url, content, content_type, fields, base_url = page
+    html = decode_html(content, content_type)[0]
+    scraper = _worker_scraper
+    scraper.base_url = base_url
+    return scraper.parsers.parse(html, 'detail', lambda soup: scraper.extract_job_data(soup, job_url, fields))
+
+
+class ParsePool:
+    """Parse job detail pages and extract their records in a pool of worker processes
+
+    Parsing and extraction are pure-Python CPU work that holds the GIL, so
+    with many fetch threads they run one at a time. Here the raw page
+    bytes go to worker processes, and JobRecords come back (plain dicts of
+    just those fields when fields is given).
+    Each worker runs its own scraper built with options (parser, strain),
+    so every process checks its parser choice on its first page.
+
+    parse() handles one page for a fetch thread and blocks until it is done.
+    The processes start on first use and stop on close().
+    """
+
+    def __init__(self, processes=None, **options):
+        self.processes = processes or os.cpu_count() or 1
+        self.options = options
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def _executor(self):
+        with self.lock:
+            if self.executor is None:
+                # spawn rather than fork: the crawler already has fetch threads running
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker, initargs=(self.options,))
+            return self.executor
+
+    def parse(self, job_url, content, content_type=None, fields=None, base_url='https://empleos.net'):
+        """JobRecord extracted from one raw detail page (a dict of fields, if given)
+
+        Links on the page are made absolute against base_url, the scraper's current one.
+        """
+        return self._executor().submit(_parse_page, (job_url, content, content_type, fields, base_url)).result()
+
+    def close(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
@@ -0,0 +1,80 @@
+import re
+import threading
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+# Fastest first - html.parser ships with Python and is the reference output
+PARSER_BACKENDS = ('lxml', 'html.parser', 'html5lib')
+REFERENCE_PARSER = 'html.parser'
+
+# Only build the parts of a page the extractors read
+LISTING_STRAINER = SoupStrainer('a', href=re.compile(r'/puesto/'))
+DETAIL_STRAINER = SoupStrainer(attrs={'class': re.compile(r'vacante|puesto|detalle|job', re.IGNORECASE)})
+
+
+def available_parsers():
+    """Return the installed parser backends, fastest first"""
+    available = []
+    for parser in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('', parser)
+        except FeatureNotFound:
+            continue
+        available.append(parser)
+    return available
+
+
+def pick_parser(preferred=None):
+    """Return the preferred backend if installed, otherwise the fastest available one"""
+    available = available_parsers()
+    if preferred:
+        if preferred in available:
+            return preferred
+        print(f"⚠️  Parser '{preferred}' is not installed, using '{available[0]}'")
+    return available[0]
+
+
+class ParserSelector:
+    """Choose a parser (and optional strainer) per page kind, verified on first use
+
+    The first page of each kind is also parsed with html.parser and no
+    strainer. If the fast setup extracts something different, the selector
+    drops the strainer and then the fast parser until the output matches.
+    """
+
+    def __init__(self, parser=None, strainers=None):
+        self.parser = pick_parser(parser)
+        self.strainers = strainers or {}
+        self.choices = {}
+        self.lock = threading.Lock()
+
+    def parse(self, markup, kind, extract):
+        """Parse markup and return extract(soup) using the verified setup for this page kind"""
+        if kind not in self.choices:
+            with self.lock:
+                if kind not in self.choices:
+                    return self._choose(markup, kind, extract)
+        parser, strainer = self.choices[kind]
+        return extract(BeautifulSoup(markup, parser, parse_only=strainer))
+
+    def _choose(self, markup, kind, extract):
+        reference = extract(BeautifulSoup(markup, REFERENCE_PARSER))
+        strainer = self.strainers.get(kind)
+
+        candidates = []
+        if strainer is not None:
+            candidates.append((self.parser, strainer))
+        if self.parser != REFERENCE_PARSER:
+            candidates.append((self.parser, None))
+
+        for parser, candidate_strainer in candidates:
+            if extract(BeautifulSoup(markup, parser, parse_only=candidate_strainer)) == reference:
+                self.choices[kind] = (parser, candidate_strainer)
+                break
+            print(f"⚠️  Parser '{parser}'{' with strainer' if candidate_strainer else ''} "
+                  f"differs from {REFERENCE_PARSER} on {kind} pages, falling back")
+        else:
+            self.choices[kind] = (REFERENCE_PARSER, None)
+
+        parser, strainer = self.choices[kind]
+        print(f"Using parser '{parser}'{' with strainer' if strainer else ''} for {kind} pages")
+        return reference
@@ -0,0 +1,165 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_DIR = 'profiles'
+
+
+class StageProfiler:
+    """Opt-in timing, allocation and call profiling of the crawl stages
+
+    Between start() and report(), code runs inside stage(name) blocks (or
+    functions wrapped with wrap()). For every stage the profiler keeps the
+    call count, inclusive and self time (self excludes nested stages) and the
+    net memory allocated according to tracemalloc. Each thread that enters a stage also gets its own cProfile
+    profiler, and a sampling thread records the stacks of all threads.
+    report() writes:
+        <run>.txt        stage table and the top cProfile functions
+        <run>.pstats     merged cProfile data (snakeviz, pstats)
+        <run>.collapsed  sampled stacks for flamegraph.pl / speedscope
+    Stage times add up across threads, so with several workers they can exceed
+    the wall time, and the allocation numbers overlap and are only a rough guide.
+    """
+
+    def __init__(self, output_dir=PROFILE_DIR, cprofile=True, trace_memory=True, sample_interval=0.005):
+        self.output_dir = output_dir
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.sample_interval = sample_interval
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.stats = {}
+        self.profilers = []
+        self.stacks = Counter()
+        self.started_at = time.perf_counter()
+        self.sampler = None
+        self.started_tracemalloc = False
+
+    def start(self):
+        """Clear earlier results and start tracing and stack sampling"""
+        self.stats = {}
+        self.profilers = []
+        self.stacks = Counter()
+        self.local = threading.local()
+        self.started_at = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        self.sampling = threading.Event()
+        self.sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self.sampler.start()
+
+    def _thread_profiler(self):
+        if not self.cprofile or getattr(self.local, 'profiled', False):
+            return
+        self.local.profiled = True
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows a single active profiler; that thread still gets stage timings
+            return
+        with self.lock:
+            self.profilers.append(profiler)
+
+    @contextmanager
+    def stage(self, name):
+        self._thread_profiler()
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        stack.append(0.0)  # time spent in nested stages
+        tracing = tracemalloc.is_tracing()
+        memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            allocated = tracemalloc.get_traced_memory()[0] - memory_before if tracing and tracemalloc.is_tracing() else 0
+            child_time = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self.lock:
+                entry = self.stats.setdefault(name, [0, 0.0, 0.0, 0])
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += elapsed - child_time
+                entry[3] += allocated
+
+    def wrap(self, fn, name):
+        """Return fn timed as the stage name"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def wrap_method(self, obj, method_name, name=None):
+        """Replace obj.method_name with a timed version on this instance only"""
+        setattr(obj, method_name, self.wrap(getattr(obj, method_name), name or method_name))
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self.sampling.wait(self.sample_interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def report(self, label='crawl'):
+        """Stop profiling and write the report files, return the .txt path"""
+        wall = time.perf_counter() - self.started_at
+        if self.sampler is not None:
+            self.sampling.set()
+            self.sampler.join()
+            self.sampler = None
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+        lines = [
+            f"Profile of {label} - wall time {wall:.2f}s, peak traced memory {peak / 1024 / 1024:.1f} MB",
+            "",
+            f"{'stage':40} {'calls':>7} {'total s':>9} {'self s':>9} {'mean ms':>9} {'% wall':>7} {'net KB':>10}",
+        ]
+        for name, (calls, total, own, allocated) in sorted(self.stats.items(), key=lambda item: -item[1][2]):
+            lines.append(f"{name:40} {calls:>7} {total:>9.3f} {own:>9.3f} {total / calls * 1000:>9.2f} "
+                         f"{own / wall * 100 if wall else 0:>6.1f}% {allocated / 1024:>10.1f}")
+
+        for profiler in self.profilers:
+            profiler.disable()
+        if self.profilers:
+            stats = pstats.Stats(*self.profilers)
+            stats.dump_stats(base + '.pstats')
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats('cumulative').print_stats(30)
+            lines += ["", "Top functions by cumulative time (cProfile)", out.getvalue()]
+
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        print(f"📊 Profile written to {base}.txt (.pstats, .collapsed)")
+        return base + '.txt'
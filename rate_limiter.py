@@ -0,0 +1,126 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to cap the request rate against a host"""
+
+    def __init__(self, rate, capacity=1):
+        # rate is in tokens (requests) per second; capacity is the allowed burst
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = float(rate)
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def acquire(self):
+        """Block until a token is available, return the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    @property
+    def current_rate(self):
+        return self.rate
+
+    def summary(self):
+        return f"request rate: {self.rate:.2f}/s"
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket whose rate follows the server's health (AIMD)
+
+    Each healthy response adds increase_step requests/second, up to max_rate.
+    A 429/5xx, a timeout or a connection error multiplies the rate by
+    decrease_factor, down to min_rate. So does a response-time average
+    (EWMA) above latency_target or above twice the best average seen so far.
+    A Retry-After header pauses every request until it has passed.
+    """
+
+    def __init__(self, rate, min_rate=0.1, max_rate=4.0, increase_step=0.05, decrease_factor=0.5,
+                 latency_target=3.0, capacity=1):
+        super().__init__(rate, capacity)
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.latency_ewma = None
+        self.latency_floor = None
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.backoffs = 0
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self.lock:
+                pause = self.paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            time.sleep(pause)
+            waited += pause
+        return waited + super().acquire()
+
+    def record(self, latency=None, status=None, error=False, retry_after=None):
+        """Feed back the outcome of one request"""
+        with self.lock:
+            now = time.monotonic()
+            if latency is not None:
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+                self.latency_floor = self.latency_ewma if self.latency_floor is None else min(self.latency_floor, self.latency_ewma)
+
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+            overloaded = error or status == 429 or (status is not None and status >= 500)
+            slow = self.latency_ewma is not None and self.latency_ewma > max(self.latency_target, 2 * self.latency_floor)
+
+            if overloaded or slow:
+                # Back off at most once per interval so a burst of failures from concurrent requests counts once
+                if now - self.last_decrease >= max(1.0, 1.0 / self.rate):
+                    self._refill()
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                    self.last_decrease = now
+                    self.backoffs += 1
+            else:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def summary(self):
+        latency = f"{self.latency_ewma:.2f}s" if self.latency_ewma is not None else "n/a"
+        return f"request rate: {self.rate:.2f}/s, avg latency: {latency}, backoffs: {self.backoffs}"
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+# Statuses that may well succeed when asked again later
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+
+def is_retryable(error):
+    """Timeouts, connection errors and 408/429/5xx are worth retrying; 404 and friends are not"""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                              requests.exceptions.ChunkedEncodingError))
+
+
+def backoff_delay(attempt, base_delay=2.0, max_delay=60.0):
+    """Exponential backoff with full jitter for the given attempt (1, 2, 3, ...)"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker
+
+    After failure_threshold failures in a row a host's circuit opens and
+    requests to it fail fast for reset_after seconds. The next request is then
+    let through as a probe: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_after=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = {}
+        self.open_until = {}
+        self.lock = threading.Lock()
+
+    def allow(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            return time.monotonic() >= self.open_until.get(host, 0)
+
+    def wait_time(self, url):
+        """Seconds until the host's circuit lets a request through again"""
+        host = urlparse(url).netloc
+        with self.lock:
+            return max(0.0, self.open_until.get(host, 0) - time.monotonic())
+
+    def record_success(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            self.failures[host] = 0
+            self.open_until.pop(host, None)
+
+    def record_failure(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            self.failures[host] = self.failures.get(host, 0) + 1
+            if self.failures[host] >= self.failure_threshold:
+                if time.monotonic() >= self.open_until.get(host, 0):
+                    print(f"⚠️  Too many failures from {host}, pausing requests for {self.reset_after:.0f}s")
+                self.open_until[host] = time.monotonic() + self.reset_after
+
+
+class RetryQueue:
+    """Job URLs that failed, waiting to be tried again with exponential backoff
+
+    defer() schedules a URL after a jittered delay, due() hands back the URLs
+    whose delay has passed, and a URL that fails max_attempts times (or with
+    an error that is not retryable) ends up in failed for the final report.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=2.0, max_delay=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempts = {}
+        self.next_at = {}
+        self.failed = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.next_at)
+
+    def defer(self, url, error):
+        """Record a failed attempt, return True if the URL will be retried"""
+        with self.lock:
+            attempts = self.attempts.get(url, 0) + 1
+            self.attempts[url] = attempts
+            if attempts >= self.max_attempts or not is_retryable(error):
+                self.next_at.pop(url, None)
+                self.failed[url] = str(error)
+                return False
+            self.next_at[url] = time.monotonic() + backoff_delay(attempts, self.base_delay, self.max_delay)
+            self.failed.pop(url, None)
+            return True
+
+    def add(self, url):
+        """Schedule a URL for an immediate retry (e.g. one carried over from a checkpoint)"""
+        with self.lock:
+            self.next_at[url] = time.monotonic()
+
+    def succeeded(self, url):
+        with self.lock:
+            self.next_at.pop(url, None)
+            self.failed.pop(url, None)
+
+    def due(self):
+        """Remove and return the URLs whose backoff has passed, oldest schedule first"""
+        now = time.monotonic()
+        with self.lock:
+            ready = sorted((at, url) for url, at in self.next_at.items() if at <= now)
+            for _, url in ready:
+                del self.next_at[url]
+        return [url for _, url in ready]
+
+    def next_delay(self):
+        """Seconds until the next URL is due, or None if the queue is empty"""
+        with self.lock:
+            if not self.next_at:
+                return None
+            return max(0.0, min(self.next_at.values()) - time.monotonic())
+
+    def pending(self):
+        with self.lock:
+            return list(self.next_at)
+
+    def report(self, id_of=lambda url: url):
+        """Print the URLs that could not be scraped, return their IDs"""
+        failed_ids = [id_of(url) for url in self.failed]
+        if failed_ids:
+            print(f"\n✗ {len(failed_ids)} jobs could not be scraped after retries:")
+            for url, error in self.failed.items():
+                print(f"  - {id_of(url)} ({self.attempts.get(url, 0)} attempts): {error}")
+        else:
+            print("\n✓ No permanently failed jobs")
+        return failed_ids
@@ -0,0 +1,156 @@
+import csv
+import json
+import os
+
+from job_schema import JOB_FIELDS, job_dict
+
+
+def cut_back(filename, offset):
+    """Truncate filename to offset bytes if it is longer"""
+    if os.path.exists(filename) and os.path.getsize(filename) > offset:
+        with open(filename, 'r+b') as f:
+            f.truncate(offset)
+
+
+class FileSink:
+    """Base for sinks that append to a .part file and rename it into place when done
+
+    Records are flushed and fsynced every fsync_every writes, so a crash loses
+    at most that many jobs and the .part file keeps everything before it.
+    synced_offsets() gives the size of the file at the last sync; a checkpoint
+    saved with it lets a resumed run pass it back as offset, and the .part
+    file is cut back to that size before appending, dropping the jobs (and any
+    torn last line) written after the checkpoint.
+    """
+
+    def __init__(self, filename, fsync_every=25, append=False, newline=None, encoding='utf-8', offset=None):
+        self.filename = filename
+        self.part_filename = filename + '.part'
+        self.fsync_every = fsync_every
+        self.count = 0
+        if append and offset is not None:
+            cut_back(self.part_filename, offset)
+        self.file = open(self.part_filename, 'a' if append else 'w', newline=newline, encoding=encoding)
+        self.synced_offset = os.fstat(self.file.fileno()).st_size
+
+    def write(self, job):
+        self._write(job)
+        self.count += 1
+        if self.count % self.fsync_every == 0:
+            self.sync()
+
+    def _write(self, job):
+        raise NotImplementedError
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.synced_offset = os.fstat(self.file.fileno()).st_size
+
+    def synced_offsets(self):
+        """{.part filename: size in bytes at the last sync}"""
+        return {self.part_filename: self.synced_offset}
+
+    def close(self, complete=True):
+        """Sync and close; a complete file replaces the target, otherwise the .part file is kept"""
+        if self.file.closed:
+            return
+        self.sync()
+        self.file.close()
+        if complete:
+            os.replace(self.part_filename, self.filename)
+            print(f"✓ Saved {self.count} jobs to {self.filename}")
+        else:
+            print(f"⚠️  Kept {self.count} jobs in {self.part_filename}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+
+class JsonlSink(FileSink):
+    """One JSON object per line (NDJSON)"""
+
+    def _write(self, job):
+        self.file.write(json.dumps(job_dict(job), ensure_ascii=False) + '\n')
+
+
+class CsvSink(FileSink):
+    """CSV with the fixed _job_* column order"""
+
+    def __init__(self, filename, fsync_every=25, append=False, offset=None):
+        # utf-8-sig writes a BOM, which must not be repeated when appending
+        part_filename = filename + '.part'
+        if append and offset is not None:
+            cut_back(part_filename, offset)
+        resuming = append and os.path.exists(part_filename) and os.path.getsize(part_filename) > 0
+        encoding = 'utf-8' if resuming else 'utf-8-sig'
+        super().__init__(filename, fsync_every, append, newline='', encoding=encoding)
+        self.writer = csv.DictWriter(self.file, fieldnames=JOB_FIELDS, extrasaction='ignore')
+        if self.file.tell() == 0:
+            self.writer.writeheader()
+
+    def _write(self, job):
+        self.writer.writerow(job)
+
+
+class StoreSink:
+    """Upsert jobs into a JobStore in small batches"""
+
+    def __init__(self, store, batch_size=25):
+        self.store = store
+        self.batch_size = batch_size
+        self.batch = []
+        self.count = 0
+
+    def write(self, job):
+        self.batch.append(job)
+        self.count += 1
+        if len(self.batch) >= self.batch_size:
+            self.sync()
+
+    def sync(self):
+        if self.batch:
+            self.store.upsert(self.batch)
+            self.batch = []
+
+    def synced_offsets(self):
+        return {}  # upserts are idempotent, a resumed run can repeat them
+
+    def close(self, complete=True):
+        self.sync()
+
+
+class MultiSink:
+    """Write every job to several sinks"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+        self.count = 0
+
+    def write(self, job):
+        for sink in self.sinks:
+            sink.write(job)
+        self.count += 1
+
+    def sync(self):
+        for sink in self.sinks:
+            sink.sync()
+
+    def synced_offsets(self):
+        offsets = {}
+        for sink in self.sinks:
+            offsets.update(sink.synced_offsets())
+        return offsets
+
+    def close(self, complete=True):
+        for sink in self.sinks:
+            sink.close(complete)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
@@ -0,0 +1,65 @@
+import unittest
+
+from text_repair import SPANISH_FIXES, SPANISH_WORDS, TextRepair, check_fix, repair_text
+
+
+class RepairTextTest(unittest.TestCase):
+    """repair_text on phrases as they come out of mis-decoded empleos.net pages"""
+
+    def assertRepairs(self, cases):
+        for mangled, expected in cases:
+            with self.subTest(mangled=mangled):
+                self.assertEqual(repair_text(mangled), expected)
+
+    def test_word_parts(self):
+        self.assertRepairs([
+            ('Ubicaci�n del Puesto', 'Ubicación del Puesto'),
+            ('Se requiere ingl�s avanzado', 'Se requiere inglés avanzado'),
+            ('M�nimo 3 a�os de experiencia', 'Mínimo 3 años de experiencia'),
+            ('Asistente de log�stica', 'Asistente de logística'),
+            ('Compa��a de dise�o web', 'Compañía de diseño web'),
+            ('Licenciatura en Administraci�n P�blica', 'Licenciatura en Administración Pública'),
+            ('Soporte t�cnico, tel�fono y asesor�a', 'Soporte técnico, teléfono y asesoría'),
+        ])
+
+    def test_whole_words_only(self):
+        self.assertRepairs([
+            ('y as� sucesivamente', 'y así sucesivamente'),
+            ('As� es el puesto', 'Así es el puesto'),
+            ('Se pas� a producci�n', 'Se pasó a producción'),
+            ('El proyecto se cas� con el cliente', 'El proyecto se casó con el cliente'),
+        ])
+
+    def test_area_case_follows_the_sentence(self):
+        self.assertRepairs([
+            ('Trabajo en el �rea de ventas', 'Trabajo en el área de ventas'),
+            ('Experiencia en �reas t�cnicas', 'Experiencia en áreas técnicas'),
+            ('�rea: Ventas', 'Área: Ventas'),
+            ('Buen ambiente. �rea de log�stica', 'Buen ambiente. Área de logística'),
+            ('Requisitos:\n�reas comerciales', 'Requisitos:\nÁreas comerciales'),
+        ])
+
+    def test_leftovers_and_clean_text(self):
+        self.assertRepairs([
+            ('Programaci�n y gesti�n', 'Programación y gestión'),
+            ('  Texto sin problemas  ', 'Texto sin problemas'),
+            ('', ''),
+            (None, ''),
+        ])
+
+
+class FixTableTest(unittest.TestCase):
+
+    def test_tables_are_valid(self):
+        for wrong, right in list(SPANISH_FIXES.items()) + list(SPANISH_WORDS.items()):
+            check_fix(wrong, right)
+
+    def test_bad_fix_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TextRepair({'a�o': 'ano'}, {})
+        with self.assertRaises(ValueError):
+            TextRepair({}, {'as�': 'asi'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import re
+
+# What a byte of Latin-1/cp1252 text turns into when it is decoded as UTF-8
+REPLACEMENT_CHAR = '�'
+
+# Letters a mangled character in Spanish text can stand for
+SPANISH_LETTERS = set('áéíóúüñÁÉÍÓÚÜÑ¿¡')
+
+# Words and word parts seen on empleos.net with a mangled accent, and how they are spelled.
+# Parts like 'ci�n' cover every word containing them, which keeps the table short
+SPANISH_FIXES = {
+    # ó
+    'ci�n': 'ción',
+    'si�n': 'sión',
+    'Ubicaci�n': 'Ubicación',
+    'm�vil': 'móvil',
+    # é
+    't�cnic': 'técnic',
+    'T�cnic': 'Técnic',
+    'Acad�mic': 'Académic',
+    'acad�mic': 'académic',
+    'G�nero': 'Género',
+    'tel�fono': 'teléfono',
+    'Tel�fono': 'Teléfono',
+    'ingl�s': 'inglés',
+    'Ingl�s': 'Inglés',
+    # á
+    'tem�tic': 'temátic',
+    'm�xim': 'máxim',
+    'M�xim': 'Máxim',
+    # í
+    'asesor�a': 'asesoría',
+    'estad�stic': 'estadístic',
+    'log�stic': 'logístic',
+    'Log�stic': 'Logístic',
+    'm�nim': 'mínim',
+    'M�nim': 'Mínim',
+    'ier�a': 'iería',
+    'd�as': 'días',
+    # ñ
+    'a�o': 'año',
+    'A�o': 'Año',
+    'spa�ol': 'spañol',
+    'compa��a': 'compañía',
+    'Compa��a': 'Compañía',
+    'ise�o': 'iseño',
+    # ú
+    'p�blic': 'públic',
+    'P�blic': 'Públic',
+}
+
+
+# Whole words, fixed only where no letter touches them: 'as�' must not turn 'pas�' into 'pasí'.
+# A word starting with � is written in lower case and capitalized at the start of a sentence
+SPANISH_WORDS = {
+    'as�': 'así',
+    'As�': 'Así',
+    '�rea': 'área',
+    '�reas': 'áreas',
+}
+
+# Text before a word that puts it at the start of a sentence (or of the text)
+SENTENCE_START = r'((?:^|[.!?:\n])\s*)?'
+
+
+def check_fix(wrong, right):
+    """Raise ValueError unless right is wrong with each � replaced by a Spanish letter"""
+    if REPLACEMENT_CHAR not in wrong or len(wrong) != len(right):
+        raise ValueError(f"Bad text fix {wrong!r} -> {right!r}")
+    for bad, good in zip(wrong, right):
+        if (bad == REPLACEMENT_CHAR and good not in SPANISH_LETTERS) or (bad != REPLACEMENT_CHAR and bad != good):
+            raise ValueError(f"Bad text fix {wrong!r} -> {right!r}")
+
+
+class TextRepair:
+    """Repair mangled accents, scanning only for the words that can be in the text
+
+    Every entry of the fix tables is indexed by the characters on each side of
+    its �. repair() splits the text on � once, keeps the entries whose
+    neighbouring characters occur there, replaces only those (longest first)
+    and turns any � left over into fallback. Entries of fixes are replaced
+    wherever they occur, entries of words only as whole words. Text without
+    a � is returned untouched, which is the common case once pages are
+    decoded with the right charset.
+    """
+
+    def __init__(self, fixes=SPANISH_FIXES, words=SPANISH_WORDS, fallback='ó'):
+        for wrong, right in list(fixes.items()) + list(words.items()):
+            check_fix(wrong, right)
+        self.fixes = dict(fixes)
+        self.fixes.update(words)
+        self.word_patterns = {
+            wrong: re.compile(SENTENCE_START + r'(?<!\w)' + re.escape(wrong) + r'(?!\w)')
+            for wrong in words
+        }
+        self.fallback = fallback
+        self.by_context = {}
+        self.order = {}
+        for rank, wrong in enumerate(sorted(self.fixes, key=len, reverse=True)):
+            self.order[wrong] = rank
+            pieces = wrong.split(REPLACEMENT_CHAR)
+            for before, after in zip(pieces, pieces[1:]):
+                # An empty side (word starts or ends with �) matches any character
+                self.by_context.setdefault((before[-1:], after[:1]), []).append(wrong)
+
+    def repair(self, text):
+        if REPLACEMENT_CHAR not in text:
+            return text
+        pieces = text.split(REPLACEMENT_CHAR)
+        befores = {piece[-1:] for piece in pieces[:-1]}
+        afters = {piece[:1] for piece in pieces[1:]}
+        befores.add('')
+        afters.add('')
+        candidates = set()
+        for (before, after), words in self.by_context.items():
+            if before in befores and after in afters:
+                candidates.update(words)
+        for wrong in sorted(candidates, key=self.order.__getitem__):
+            if wrong not in text:
+                continue
+            if wrong in self.word_patterns:
+                text = self.word_patterns[wrong].sub(self._word_fixer(wrong), text)
+            else:
+                text = text.replace(wrong, self.fixes[wrong])
+        return text.replace(REPLACEMENT_CHAR, self.fallback)
+
+    def _word_fixer(self, wrong):
+        right = self.fixes[wrong]
+        capitalized = right[:1].upper() + right[1:] if wrong.startswith(REPLACEMENT_CHAR) else right
+
+        def fix(match):
+            start = match.group(1)
+            return start + capitalized if start is not None else right
+        return fix
+
+
+SPANISH_REPAIR = TextRepair()
+
+
+def repair_text(text):
+    """Fix mangled Spanish accents and strip surrounding whitespace"""
+    if not text:
+        return ''
+    return SPANISH_REPAIR.repair(text).strip()
@@ -0,0 +1,106 @@
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class RequestsTransport:
+    """requests.Session with a sized connection pool, keep-alive switch and split timeouts
+
+    adapter replaces the default HTTPAdapter (e.g. the on-disk CachingAdapter,
+    which must then be built with the same pool size).
+    """
+
+    name = 'requests'
+
+    def __init__(self, pool_size=4, keep_alive=True, connect_timeout=10, read_timeout=30,
+                 headers=None, adapter=None):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+        self.adapter = adapter or HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def get(self, url, params=None, timeout=None):
+        return self.session.get(url, params=params, timeout=timeout or self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxTransport:
+    """httpx client, HTTP/2 when the h2 package is installed, returning requests.Response objects
+
+    All requests multiplex over one HTTP/2 connection. httpx errors are raised
+    as the matching requests exceptions so callers handle both transports alike.
+    The on-disk cache only works with RequestsTransport.
+    """
+
+    name = 'httpx'
+
+    def __init__(self, pool_size=4, keep_alive=True, connect_timeout=10, read_timeout=30,
+                 headers=None, http2=True):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("The httpx transport needs httpx: pip install 'httpx[http2]'")
+        self.httpx = httpx
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("⚠️  h2 is not installed, httpx will use HTTP/1.1")
+                http2 = False
+        self.pool_size = pool_size
+        self.client = httpx.Client(
+            http2=http2,
+            headers=headers or {},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size,
+                                max_keepalive_connections=pool_size if keep_alive else 0),
+            follow_redirects=True,
+        )
+
+    def get(self, url, params=None, timeout=None):
+        kwargs = {}
+        if timeout:
+            connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            kwargs['timeout'] = self.httpx.Timeout(read, connect=connect)
+        try:
+            response = self.client.get(url, params=params, **kwargs)
+        except self.httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except self.httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        return self._to_requests_response(response)
+
+    def _to_requests_response(self, response):
+        converted = requests.Response()
+        converted.status_code = response.status_code
+        converted.reason = response.reason_phrase
+        converted.headers = CaseInsensitiveDict(response.headers.items())
+        converted.encoding = get_encoding_from_headers(converted.headers)
+        converted._content = response.content
+        converted.url = str(response.url)
+        converted.http_version = response.http_version
+        return converted
+
+    def close(self):
+        self.client.close()
+
+
+TRANSPORTS = {
+    'requests': RequestsTransport,
+    'httpx': HttpxTransport,
+}
+
+
+def make_transport(name='requests', **kwargs):
+    """Build a transport by name (see TRANSPORTS)"""
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{name}', choose from {', '.join(TRANSPORTS)}")
+    return TRANSPORTS[name](**kwargs)
@@ -1,23 +1,238 @@
 import requests
-from bs4 import BeautifulSoup
+import collections
+import functools
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from urllib.parse import urljoin, parse_qs, urlparse
 import re
-import os
+import threading
+import time
+
+from archive import ARCHIVE_DIR, CODECS, archive_jsonl, write_partition
+from cassette import CassetteAdapter
+from charset import response_html
+from checkpoint import CrawlCheckpoint
+from field_index import FieldIndex
+from http_cache import HTTP_CACHE_DIR, CachingAdapter, source_version
+from job_schema import JOB_FIELDS, JobRecord, LazyJobRecord, check_job_fields, extract_job_id, job_dict, redate_job
+from job_store import JobStore
+from listing_scan import scan_job_links, scan_last_page
+from metrics import CrawlMetrics
+from parse_pool import ParsePool
+from parser_backend import DETAIL_STRAINER, LISTING_STRAINER, ParserSelector
+from profiler import PROFILE_DIR, StageProfiler
+from rate_limiter import AdaptiveRateLimiter, TokenBucket, parse_retry_after
+from retry_queue import CircuitBreaker, CircuitOpenError, RetryQueue, backoff_delay, is_retryable
+from sinks import CsvSink, JsonlSink, MultiSink, StoreSink
+from text_repair import repair_text
+from transport import make_transport
+
+# Label texts looked up on job detail pages - compiled once, matched in a single pass
+LABEL_PATTERNS = {
+    'urgent': re.compile(r'Vacante\s+Fresca|Urgente', re.IGNORECASE),
+    'description': re.compile(r'Funciones del Puesto|Descripción', re.IGNORECASE),
+    'about_section': re.compile(r'ACERCA DE LA VACANTE', re.IGNORECASE),
+    'functions_section': re.compile(r'Funciones', re.IGNORECASE),
+    'description_section': re.compile(r'Descripción', re.IGNORECASE),
+    'category': re.compile(r'Área del Puesto', re.IGNORECASE),
+    'type': re.compile(r'Tiempo Completo|Tiempo Parcial|Full[-\s]?Time|Part[-\s]?Time', re.IGNORECASE),
+    'gender': re.compile(r'Género|Gender|Sexo', re.IGNORECASE),
+    'salary_any': re.compile(r'Salario|Salary|Sueldo', re.IGNORECASE),
+    'salary': re.compile(r'Salario', re.IGNORECASE),
+    'experience': re.compile(r'Experiencia Deseada|Experiencia|Experience', re.IGNORECASE),
+    'career_level': re.compile(r'Nivel de Cómputo|Career Level|Nivel', re.IGNORECASE),
+    'qualification': re.compile(r'Nivel Académico', re.IGNORECASE),
+    'deadline': re.compile(r'Fecha[\s]+Límite|Deadline|Cierre', re.IGNORECASE),
+    'location': re.compile(r'Ubicación del Puesto', re.IGNORECASE),
+    'location_text': re.compile(r'[A-Z][a-záéíóúñ\s]+,\s*[A-Z][a-záéíóúñ\s]+,\s*Costa Rica', re.IGNORECASE),
+}
+
+# Tags looked up on job detail pages: (tag names, attribute, pattern)
+TAG_RULES = {
+    'heading': (('h1', 'h2', 'h3'), None, None),
+    'image': ('img', None, None),
+    'logo_image': ('img', 'class', re.compile(r'logo|company', re.IGNORECASE)),
+    'tag_icon': ('img', 'src', re.compile(r'icon|tag')),
+    'featured_badge': (None, 'class', re.compile(r'featured|destacado', re.IGNORECASE)),
+    'title_class': (None, 'class', re.compile(r'title|puesto|job-title')),
+    'category_div': ('div', 'class', re.compile(r'area|category')),
+    'location_class': (None, 'class', re.compile(r'location|ubicacion')),
+    'location_icon': ('i', 'class', re.compile(r'location|map|pin')),
+    'video': ('iframe', 'src', re.compile(r'youtube|vimeo', re.IGNORECASE)),
+}
+
+VACANTE_FRESCA_PATTERN = re.compile(r'Vacante\s+Fresca', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+NUMBER_PATTERN = re.compile(r'\d+')
 
 class CostaRicaJobsScraper:
-    def __init__(self):
+    def __init__(self, workers=4, requests_per_second=1.0, parser=None, strain=False,
+                 cache_dir=None, cache_ttl=7 * 24 * 3600, cache_max_bytes=200 * 1024 * 1024,
+                 adaptive=True, max_requests_per_second=4.0, prefetch_pages=None, max_attempts=4,
+                 transport='requests', pool_size=None, keep_alive=True, connect_timeout=10, read_timeout=30,
+                 cassette_dir=None, record=False, profile_dir=None, metrics_path=None, scan_listings=True,
+                 parse_processes=0):
         self.base_url = "https://empleos.net"
         self.search_url = "https://empleos.net/buscar_vacantes.php"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.workers = max(1, workers)
+        # Listing pages fetched ahead (in parallel) of the detail workers, 0 = none
+        self.prefetch_pages = self.workers if prefetch_pages is None else prefetch_pages
+        headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        }
+        
+        # One connection pool shared by the detail workers and the listing prefetcher,
+        # optionally backed by the on-disk cache or a record/replay cassette (requests transport only).
+        # It holds a connection for every worker and every prefetched page, so none is opened and
+        # thrown away ("Connection pool is full"); a smaller pool_size limits the prefetch instead
+        if pool_size:
+            self.prefetch_pages = min(self.prefetch_pages, max(pool_size - self.workers, 0))
+        pool_size = pool_size or self.workers + max(self.prefetch_pages, 1)
+        options = dict(pool_size=pool_size, keep_alive=keep_alive, connect_timeout=connect_timeout,
+                       read_timeout=read_timeout, headers=headers)
+        self.http_cache = None
+        self.cassette = None
+        if (cache_dir or cassette_dir) and transport != 'requests':
+            print(f"⚠️  The HTTP cache and cassettes only work with the requests transport, not '{transport}'")
+        elif cassette_dir:
+            self.cassette = CassetteAdapter(cassette_dir, record=record,
+                                            pool_connections=1, pool_maxsize=pool_size)
+            options['adapter'] = self.cassette
+        elif cache_dir:
+            self.http_cache = CachingAdapter(cache_dir, ttl=cache_ttl, max_bytes=cache_max_bytes,
+                                             pool_connections=1, pool_maxsize=pool_size)
+            options['adapter'] = self.http_cache
+            # Cached records are only reused by this scraper with this extraction code
+            self.record_key = 'two_page:' + source_version(type(self), FieldIndex, JobRecord, repair_text, response_html)
+        self.transport = make_transport(transport, **options)
+        replaying = self.cassette is not None and not record
+        
+        # Slow website - every request goes through the limiter instead of fixed sleeps.
+        # The adaptive limiter starts at requests_per_second and speeds up or backs off with the site
+        if replaying:
+            # Replayed responses come from disk, there is no server to be polite to
+            self.rate_limiter = TokenBucket(10000, capacity=pool_size)
+        elif adaptive:
+            self.rate_limiter = AdaptiveRateLimiter(requests_per_second, max_rate=max_requests_per_second)
+        else:
+            self.rate_limiter = TokenBucket(requests_per_second)
+        
+        # Failed job pages are retried later with backoff; a failing host is paused by the circuit breaker
+        self.retries = RetryQueue(1 if replaying else max_attempts)
+        self.circuit = CircuitBreaker()
+        self.failed_job_ids = []
+        
+        # Latency, throughput and error counters, written to metrics_path.prom / .json when set
+        self.metrics = CrawlMetrics(metrics_path)
+        
+        # Fastest installed parser, checked against html.parser on the first page of each kind.
+        # strain=True only builds job links on listings and the vacancy container on detail pages
+        strainers = {'listing': LISTING_STRAINER, 'detail': DETAIL_STRAINER} if strain else None
+        self.parsers = ParserSelector(parser, strainers)
+        
+        # Optionally parse detail pages in worker processes so extraction uses every core
+        # (parse_processes=None for one per core, 0 to parse in the fetching threads)
+        self.parse_pool = None
+        if parse_processes != 0:
+            self.parse_pool = ParsePool(parse_processes, parser=parser, strain=strain)
+        
+        # Pull job links out of listing pages with one regex pass instead of a soup,
+        # checked against the soup extraction on the first page like the parsers
+        self.scan_listings = scan_listings
+        self.scan_checked = False
+        self.scan_lock = threading.Lock()
+        
+        # Opt-in profiling: time every stage of this instance and write a report per crawl
+        self.profiler = StageProfiler(profile_dir) if profile_dir else None
+        if self.profiler:
+            self._profile_stages()
+    
+    def _profile_stages(self):
+        """Wrap the fetch, parse, extract and clean stages of this instance with the profiler"""
+        profiler = self.profiler
+        profiler.wrap_method(self, '_get', 'fetch')
+        profiler.wrap_method(self.rate_limiter, 'acquire', 'fetch.rate_limit')
+        profiler.wrap_method(self.parsers, 'parse', 'parse')
+        profiler.wrap_method(self, '_scan_job_urls', 'parse.listing_scan')
+        if self.parse_pool:
+            profiler.wrap_method(self.parse_pool, 'parse', 'parse.process_pool')
+        profiler.wrap_method(self, 'extract_job_data', 'extract')
+        profiler.wrap_method(self, 'clean_text', 'clean_text')
+        for name in dir(type(self)):
+            if name.startswith(('extract_', 'is_')) and name != 'extract_job_data':
+                profiler.wrap_method(self, name, f'extract.{name}')
+        
+        crawl = self.scrape_all_pages
+        
+        @functools.wraps(crawl)
+        def profiled_crawl(*args, **kwargs):
+            sink = kwargs.get('sink')
+            if sink is not None:
+                profiler.wrap_method(sink, 'write', 'sink.write')
+                profiler.wrap_method(sink, 'sync', 'sink.sync')
+            profiler.start()
+            try:
+                with profiler.stage('crawl'):
+                    return crawl(*args, **kwargs)
+            finally:
+                profiler.report()
+        
+        self.scrape_all_pages = profiled_crawl
+        
+    def _get(self, url, **kwargs):
+        """Rate-limited GET shared by listing and detail requests"""
+        if not self.circuit.allow(url):
+            self.metrics.error('CircuitOpenError')
+            raise CircuitOpenError(f"Requests to {urlparse(url).netloc} are paused after repeated failures")
+        self.metrics.slept(self.rate_limiter.acquire())
+        adaptive = isinstance(self.rate_limiter, AdaptiveRateLimiter)
+        
+        started = time.monotonic()
+        try:
+            response = self.transport.get(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.metrics.error(type(e).__name__)
+            if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+                self.circuit.record_failure(url)
+                if adaptive:
+                    self.rate_limiter.record(time.monotonic() - started, error=True)
+            raise
+        elapsed = time.monotonic() - started
+        
+        kind = 'detail' if '/puesto/' in url else 'listing'
+        self.metrics.observe_request(kind, elapsed, len(response.content), getattr(response, 'from_cache', None))
+        if response.status_code >= 400:
+            self.metrics.error(f'http_{response.status_code}')
         
+        if response.status_code == 429 or response.status_code >= 500:
+            self.circuit.record_failure(url)
+        else:
+            self.circuit.record_success(url)
+        if adaptive:
+            self.rate_limiter.record(elapsed, response.status_code,
+                                     retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        self.metrics.request_rate = round(self.rate_limiter.current_rate, 2)
+        return response
+    
+    def print_network_summary(self):
+        """Print cache / cassette hits and the request rate of this run"""
+        if self.http_cache:
+            print(self.http_cache.summary())
+        if self.cassette:
+            print(self.cassette.summary())
+        print(self.rate_limiter.summary())
+    
     def get_job_listings_page(self, page=1):
         """Get job listings from a specific page"""
+        try:
+            return self._request_listing_page(page)
+        except Exception as e:
+            print(f"Error fetching page {page}: {e}")
+            return None
+    
+    def _request_listing_page(self, page):
+        """HTML of a listings page; request errors and HTTP error statuses are raised"""
         params = {
             'Claves': '',
             'Area': '',
@@ -28,170 +243,247 @@ class CostaRicaJobsScraper:
         if page > 1:
             params['pagelocales'] = page
         
-        try:
-            print(f"\nFetching page {page}...")
-            print(f"Parameters: {params}")
-            
-            response = self.session.get(self.search_url, params=params, timeout=30)
-            response.raise_for_status()
-            print(f"Response URL: {response.url}")
-            print(f"Response length: {len(response.text)} characters")
-            
-            # Debug: Check if URL actually changed
-            if page > 1:
-                if 'pagelocales' in response.url or f'pagelocales={page}' in response.url:
-                    print(f"✓ Pagination parameter accepted: pagelocales={page}")
-                else:
-                    print(f"⚠️  WARNING: Pagination parameter NOT in URL!")
-            
-            time.sleep(3)  # Slow website - be respectful
-            return response.text
-        except Exception as e:
-            print(f"Error fetching page {page}: {e}")
-            return None
+        print(f"\nFetching page {page}...")
+        print(f"Parameters: {params}")
+        
+        response = self._get(self.search_url, params=params)
+        response.raise_for_status()
+        print(f"Response URL: {response.url}")
+        html = response_html(response)
+        print(f"Response length: {len(html)} characters")
+        
+        # Debug: Check if URL actually changed
+        if page > 1:
+            if 'pagelocales' in response.url or f'pagelocales={page}' in response.url:
+                print(f"✓ Pagination parameter accepted: pagelocales={page}")
+            else:
+                print(f"⚠️  WARNING: Pagination parameter NOT in URL!")
+        
+        return html
+    
+    def _fetch_listing_page(self, page):
+        """Listings page with backoff retries, since a missing listing page ends the crawl
+        
+        Only failures is_retryable accepts (timeouts, connection errors, 429, 5xx) are
+        retried; a 404 or a bug gives up on the page straight away.
+        """
+        max_attempts = self.retries.max_attempts
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return self._request_listing_page(page)
+            except Exception as e:
+                print(f"Error fetching page {page}: {e}")
+                if not isinstance(e, requests.exceptions.RequestException):
+                    self.metrics.error(type(e).__name__)  # request errors are counted in _get
+                if not is_retryable(e) or attempt == max_attempts:
+                    return None
+            delay = max(backoff_delay(attempt, self.retries.base_delay, self.retries.max_delay),
+                        self.circuit.wait_time(self.search_url))
+            print(f"Retrying page {page} in {delay:.1f}s (attempt {attempt + 1}/{max_attempts})...")
+            time.sleep(delay)
+            self.metrics.slept(delay)
     
     def parse_job_listings_from_page(self, html):
         """Extract all job URLs from a listings page"""
         if not html:
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
-        job_urls = []
-        
-        # Method 1: Find all links with /puesto/ in href
-        job_links = soup.find_all('a', href=re.compile(r'/puesto/\d+'))
-        print(f"Found {len(job_links)} job links with /puesto/ pattern")
+        if self.scan_listings:
+            unique_urls = self._scan_job_urls(html)
+        else:
+            unique_urls = self.parsers.parse(html, 'listing', self._extract_job_urls)
         
         # Debug: Print first few job IDs to check if they're different
-        if job_links:
-            sample_ids = []
-            for link in job_links[:10]:  # Show first 10
-                href = link.get('href')
-                if href:
-                    match = re.search(r'/puesto/(\d+)', href)
-                    if match:
-                        job_id = match.group(1)
-                        sample_ids.append(job_id)
-            print(f"Sample job IDs from this page: {sample_ids}")
-        
-        for link in job_links:
+        sample_ids = []
+        for url in unique_urls[:10]:  # Show first 10
+            job_id = extract_job_id(url)
+            if job_id:
+                sample_ids.append(job_id)
+        print(f"Sample job IDs from this page: {sample_ids}")
+        print(f"Total unique URLs extracted: {len(unique_urls)}")
+        
+        return unique_urls
+    
+    def _scan_job_urls(self, html):
+        """Job URLs of a listings page from the regex scanner, falling back to the soup if it disagrees"""
+        job_urls = list(scan_job_links(html, self.base_url).values())
+        if self.scan_checked:
+            return job_urls
+        with self.scan_lock:
+            if not self.scan_checked:
+                reference = self.parsers.parse(html, 'listing', self._extract_job_urls)
+                if reference != job_urls:
+                    print("⚠️  Listing scanner differs from the parsed page, parsing listing pages instead")
+                    self.scan_listings = False
+                    job_urls = reference
+                self.scan_checked = True
+        return job_urls
+    
+    def _extract_job_urls(self, soup):
+        """Collect unique job URLs from a parsed listings page, in page order"""
+        job_urls = {}  # insertion-ordered set
+        
+        # Method 1: Find all links with /puesto/ in href
+        for link in soup.find_all('a', href=re.compile(r'/puesto/\d+')):
             href = link.get('href')
             if href:
-                full_url = urljoin(self.base_url, href)
-                if full_url not in job_urls:
-                    job_urls.append(full_url)
+                job_urls.setdefault(urljoin(self.base_url, href))
         
         # Method 2: Look for specific job card classes
         job_cards = soup.find_all('div', class_=re.compile(r'job|vacancy|puesto|oferta', re.IGNORECASE))
         for card in job_cards:
             link = card.find('a', href=re.compile(r'/puesto/'))
             if link:
-                href = link.get('href')
-                full_url = urljoin(self.base_url, href)
-                if full_url not in job_urls:
-                    job_urls.append(full_url)
-        
-        # Remove duplicates while preserving order
-        unique_urls = []
-        seen = set()
-        for url in job_urls:
-            if url not in seen:
-                unique_urls.append(url)
-                seen.add(url)
-        
-        print(f"Total unique URLs extracted: {len(unique_urls)}")
+                job_urls.setdefault(urljoin(self.base_url, link.get('href')))
         
-        return unique_urls
+        return list(job_urls)
     
     def check_if_more_pages(self, html):
         """Check if there are more pages to scrape and extract next page URL"""
         if not html:
             return False
         
-        soup = BeautifulSoup(html, 'html.parser')
+        found = self.parsers.parse(html, 'pagination', self._find_pagination)
+        if found:
+            print(found)
+            return True
         
+        print("No pagination indicators found")
+        return False
+    
+    def _find_pagination(self, soup):
+        """Describe the first pagination indicator on a parsed listings page, or None"""
         # Look for "siguiente" or "next" link
         next_link = soup.find('a', text=re.compile(r'siguiente|next|>|»', re.IGNORECASE))
         if next_link and next_link.get('href'):
-            print(f"Found next page link: {next_link.get('href')}")
-            return True
+            return f"Found next page link: {next_link.get('href')}"
         
         # Look for numbered pagination links
         pagination_links = soup.find_all('a', href=re.compile(r'Pag=\d+', re.IGNORECASE))
         if pagination_links:
-            print(f"Found {len(pagination_links)} pagination links")
+            lines = [f"Found {len(pagination_links)} pagination links"]
             for link in pagination_links:
-                print(f"  - {link.get('href')}")
-            return True
+                lines.append(f"  - {link.get('href')}")
+            return '\n'.join(lines)
         
         # Check for any pagination container
         pagination = soup.find_all(['div', 'ul'], class_=re.compile(r'pag|page|navigation', re.IGNORECASE))
         if pagination:
-            print(f"Found pagination container: {pagination}")
-            return True
+            return f"Found {len(pagination)} pagination container(s)"
         
-        print("No pagination indicators found")
-        return False
+        return None
     
-    def get_job_details(self, job_url):
-        """Scrape detailed job information from individual job page"""
+    def get_job_details(self, job_url, fields=None, lazy=False):
+        """Scrape detailed job information from individual job page
+        
+        fields limits the record to those job fields, and lazy=True returns a
+        LazyJobRecord that extracts fields as they are read. Either way the
+        partial record is not kept in the HTTP cache.
+        """
+        if fields is not None:
+            check_job_fields(fields)
         try:
             print(f"  Fetching: {job_url}")
-            response = self.session.get(job_url, timeout=30)
+            response = self._get(job_url)
             response.raise_for_status()
             
-            time.sleep(2)  # Be respectful to the server
-            
-            # Use response.text as-is, let BeautifulSoup handle encoding
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Same body as last run - reuse the job extracted from it
+            content_hash = getattr(response, 'content_hash', None)
+            if self.http_cache and content_hash:
+                job_data = self.http_cache.get_record(job_url, content_hash, self.record_key)
+                if job_data:
+                    print(f"  ↺ Unchanged since last run: {job_url}")
+                    job_data = redate_job(job_data, self.calculate_expiry_date())
+                    if fields is not None:
+                        return {field: job_data[field] for field in JOB_FIELDS if field in fields}
+                    return JobRecord.from_dict(job_data)
             
-            # Extract location first as it's used for address and map_location
-            location_value = self.extract_location(soup)
+            if self.parse_pool and not lazy:
+                job_data = self.parse_pool.parse(job_url, response.content, response.headers.get('Content-Type'),
+                                                 fields, self.base_url)
+            else:
+                if lazy:
+                    extract = lambda soup: self.lazy_job_data(soup, job_url)
+                else:
+                    extract = lambda soup: self.extract_job_data(soup, job_url, fields)
+                job_data = self.parsers.parse(response_html(response), 'detail', extract)
             
-            job_data = {
-                '_job_featured_image': self.extract_featured_image(soup),
-                '_job_title': self.extract_title(soup),
-                '_job_featured': self.is_featured(soup),
-                '_job_filled': 0,  # Default
-                '_job_urgent': self.is_urgent(soup),
-                '_job_description': self.extract_description(soup),
-                '_job_category': self.extract_category(soup),
-                '_job_type': self.extract_type(soup),
-                '_job_tag': 'Costa Rica',
-                '_job_expiry_date': self.calculate_expiry_date(),
-                '_job_gender': self.extract_gender(soup),
-                '_job_apply_type': 'external',
-                '_job_apply_url': job_url,
-                '_job_apply_email': self.extract_email(soup),
-                '_job_salary_type': self.extract_salary_type(soup),
-                '_job_salary': self.extract_salary(soup),
-                '_job_max_salary': self.extract_salary(soup),
-                '_job_experience': self.extract_experience(soup),
-                '_job_career_level': self.extract_career_level(soup),
-                '_job_qualification': self.extract_qualification(soup),
-                '_job_video_url': self.extract_video(soup),
-                '_job_photos': self.extract_photos(soup),
-                '_job_application_deadline_date': self.extract_deadline(soup),
-                '_job_address': location_value,
-                '_job_location': location_value,
-                '_job_map_location': location_value
-            }
+            if self.http_cache and content_hash and fields is None and not lazy:
+                self.http_cache.store_record(job_url, content_hash, job_data.to_dict(), self.record_key)
             
+            self.retries.succeeded(job_url)
             return job_data
             
         except Exception as e:
             print(f"  ✗ Error getting job details from {job_url}: {e}")
+            if not isinstance(e, requests.exceptions.RequestException):
+                self.metrics.error(type(e).__name__)  # request errors are counted in _get
+            if self.retries.defer(job_url, e):
+                print(f"  ↻ Will retry {job_url} later")
             return None
     
-    def extract_featured_image(self, soup):
+    def extract_job_data(self, soup, job_url, fields=None):
+        """Build the JobRecord from a parsed job detail page
+        
+        With fields (names from JOB_FIELDS), only those are extracted and returned as a dict.
+        """
+        # Walk the page once; every extractor reads from this index
+        index = FieldIndex(soup, LABEL_PATTERNS, TAG_RULES)
+        extractors = self.job_extractors(index, job_url)
+        if fields is None:
+            return JobRecord.from_dict({field: extract() for field, extract in extractors.items()})
+        check_job_fields(fields)
+        return {field: extractors[field]() for field in JOB_FIELDS if field in fields}
+    
+    def lazy_job_data(self, soup, job_url):
+        """Job record from a parsed detail page whose fields are only extracted when read"""
+        return LazyJobRecord(self.job_extractors(FieldIndex(soup, LABEL_PATTERNS, TAG_RULES), job_url))
+    
+    def job_extractors(self, index, job_url):
+        """Map every job field to a function of no arguments that extracts it from the index"""
+        extract = functools.partial
+        # Shared by several fields, extracted once
+        location = functools.lru_cache(maxsize=None)(extract(self.extract_location, index))
+        salary = functools.lru_cache(maxsize=None)(extract(self.extract_salary, index))
+        
+        return {
+            '_job_featured_image': extract(self.extract_featured_image, index),
+            '_job_title': extract(self.extract_title, index),
+            '_job_featured': extract(self.is_featured, index),
+            '_job_filled': lambda: 0,  # Default
+            '_job_urgent': extract(self.is_urgent, index),
+            '_job_description': extract(self.extract_description, index),
+            '_job_category': extract(self.extract_category, index),
+            '_job_type': extract(self.extract_type, index),
+            '_job_tag': lambda: 'Costa Rica',
+            '_job_expiry_date': self.calculate_expiry_date,
+            '_job_gender': extract(self.extract_gender, index),
+            '_job_apply_type': lambda: 'external',
+            '_job_apply_url': lambda: job_url,
+            '_job_apply_email': extract(self.extract_email, index),
+            '_job_salary_type': extract(self.extract_salary_type, index),
+            '_job_salary': salary,
+            '_job_max_salary': salary,
+            '_job_experience': extract(self.extract_experience, index),
+            '_job_career_level': extract(self.extract_career_level, index),
+            '_job_qualification': extract(self.extract_qualification, index),
+            '_job_video_url': extract(self.extract_video, index),
+            '_job_photos': extract(self.extract_photos, index),
+            '_job_application_deadline_date': extract(self.extract_deadline, index),
+            '_job_address': location,
+            '_job_location': location,
+            '_job_map_location': location,
+        }
+    
+    def extract_featured_image(self, index):
         """Extract company logo or featured image"""
         # Look for company logo
-        img = soup.find('img', class_=re.compile(r'logo|company', re.IGNORECASE))
+        img = index.first('logo_image')
         if img and img.get('src'):
             return urljoin(self.base_url, img['src'])
         
         # Look for any prominent image near the title
-        title_area = soup.find(['h1', 'h2'])
+        title_area = next((h for h in index.all('heading') if h.name in ('h1', 'h2')), None)
         if title_area:
             nearby_img = title_area.find_parent().find('img')
             if nearby_img and nearby_img.get('src'):
@@ -199,17 +491,17 @@ class CostaRicaJobsScraper:
         
         return ''
     
-    def extract_title(self, soup):
+    def extract_title(self, index):
         """Extract job title with proper encoding"""
         # First try to find the main heading with the job title (e.g., "Miscelánea")
         # Look for h1, h2, or specific job title patterns
         title_candidates = []
         
         # Try h1, h2 tags first
-        for heading in soup.find_all(['h1', 'h2', 'h3']):
+        for heading in index.all('heading'):
             text = heading.get_text(strip=True)
             # Remove badges like "Vacante Fresca"
-            text = re.sub(r'Vacante\s+Fresca', '', text, flags=re.IGNORECASE).strip()
+            text = VACANTE_FRESCA_PATTERN.sub('', text).strip()
             if text and len(text) > 2:
                 title_candidates.append(text)
         
@@ -218,28 +510,28 @@ class CostaRicaJobsScraper:
             return self.clean_text(title_candidates[0])
         
         # Fallback: look for class patterns
-        title = soup.find(class_=re.compile(r'title|puesto|job-title'))
+        title = index.first('title_class')
         if title:
             text = title.get_text(strip=True)
-            text = re.sub(r'Vacante\s+Fresca', '', text, flags=re.IGNORECASE)
+            text = VACANTE_FRESCA_PATTERN.sub('', text)
             return self.clean_text(text.strip())
         
         return ''
     
-    def is_featured(self, soup):
+    def is_featured(self, index):
         """Check if job is featured - returns 1 or 0"""
-        featured_badge = soup.find(class_=re.compile(r'featured|destacado', re.IGNORECASE))
+        featured_badge = index.first('featured_badge')
         return 1 if featured_badge is not None else 0
     
-    def is_urgent(self, soup):
+    def is_urgent(self, index):
         """Check if job is urgent - returns 1 or 0"""
-        urgent_badge = soup.find(text=re.compile(r'Vacante\s+Fresca|Urgente', re.IGNORECASE))
+        urgent_badge = index.label('urgent')
         return 1 if urgent_badge is not None else 0
     
-    def extract_description(self, soup):
+    def extract_description(self, index):
         """Extract job description with proper encoding"""
         # Look for "Funciones del Puesto" section
-        desc_section = soup.find(text=re.compile(r'Funciones del Puesto|Descripción', re.IGNORECASE))
+        desc_section = index.label('description')
         if desc_section:
             parent = desc_section.find_parent()
             if parent:
@@ -251,8 +543,8 @@ class CostaRicaJobsScraper:
                     return self.clean_text(text)
         
         # Fallback: look for common description classes or sections
-        for section_name in ['ACERCA DE LA VACANTE', 'Funciones', 'Descripción']:
-            section = soup.find(text=re.compile(section_name, re.IGNORECASE))
+        for section_name in ['about_section', 'functions_section', 'description_section']:
+            section = index.label(section_name)
             if section:
                 parent = section.find_parent()
                 if parent:
@@ -264,55 +556,13 @@ class CostaRicaJobsScraper:
         return ''
     
     def clean_text(self, text):
-        """Clean and fix encoding issues - replace � symbols with correct Spanish characters"""
-        if not text:
-            return ''
-        
-        # The � symbol appears when UTF-8 text is incorrectly read
-        # We need to identify the pattern and fix it
-        
-        # Common patterns where � appears before certain letters
-        # These are the actual Unicode characters that got mangled
-        fixes = {
-            # ó patterns
-            'Descripci�n': 'Descripción',
-            'importaci�n': 'importación',
-            'exportaci�n': 'exportación',
-            'actuaci�n': 'actuación',
-            'operaci�n': 'operación',
-            'Corporaci�n': 'Corporación',
-            'revisi�n': 'revisión',
-            
-            # é patterns  
-            't�cnicos': 'técnicos',
-            't�cnicas': 'técnicas',
-            't�cnica': 'técnica',
-            'tem�tica': 'temática',
-            'Acad�mico': 'Académico',
-            
-            # í patterns
-            'asesor�a': 'asesoría',
-            'estad�sticas': 'estadísticas',
-            'Tibás': 'Tibás',
-            
-            # á patterns
-            'as�': 'así',
-            'Elaboraci�n': 'Elaboración',
-            
-            # Generic � to common Spanish characters (last resort)
-            '�': 'ó',  # Most common
-        }
-        
-        # Apply all fixes
-        for wrong, correct in fixes.items():
-            text = text.replace(wrong, correct)
-        
-        return text.strip()
+        """Fix mangled Spanish accents (see text_repair.py) and strip whitespace"""
+        return repair_text(text)
     
-    def extract_category(self, soup):
+    def extract_category(self, index):
         """Extract job category/area (in Spanish)"""
         # Look for "Área del Puesto" section
-        area_label = soup.find(text=re.compile(r'Área del Puesto', re.IGNORECASE))
+        area_label = index.label('category')
         if area_label:
             # Find the next element that contains the actual category value
             parent = area_label.find_parent()
@@ -332,16 +582,16 @@ class CostaRicaJobsScraper:
                         break
         
         # Try finding category near the title or in job details section
-        category_section = soup.find('div', class_=re.compile(r'area|category'))
+        category_section = index.first('category_div')
         if category_section:
             return self.clean_text(category_section.get_text(strip=True))
         
         return ''
     
-    def extract_type(self, soup):
+    def extract_type(self, index):
         """Extract job type (in Spanish)"""
         # Look for employment type
-        type_text = soup.find(text=re.compile(r'Tiempo Completo|Tiempo Parcial|Full[-\s]?Time|Part[-\s]?Time', re.IGNORECASE))
+        type_text = index.label('type')
         if type_text:
             text = type_text.get_text(strip=True) if hasattr(type_text, 'get_text') else str(type_text)
             text_lower = text.lower()
@@ -351,11 +601,11 @@ class CostaRicaJobsScraper:
                 return 'Tiempo Parcial'
         return 'Tiempo Completo'  # Default
     
-    def extract_tags(self, soup):
+    def extract_tags(self, index):
         """Extract job tags"""
         tags = []
         # Look for icons or badges that might indicate tags
-        icons = soup.find_all('img', src=re.compile(r'icon|tag'))
+        icons = index.all('tag_icon')
         for icon in icons:
             alt_text = icon.get('alt', '').strip()
             if alt_text:
@@ -367,9 +617,9 @@ class CostaRicaJobsScraper:
         expiry = datetime.now() + timedelta(days=90)
         return expiry.strftime('%Y-%m-%d')
     
-    def extract_gender(self, soup):
+    def extract_gender(self, index):
         """Extract gender requirement (in Spanish)"""
-        gender_text = soup.find(text=re.compile(r'Género|Gender|Sexo', re.IGNORECASE))
+        gender_text = index.label('gender')
         if gender_text:
             parent = gender_text.find_parent()
             if parent:
@@ -384,16 +634,15 @@ class CostaRicaJobsScraper:
                         return 'Indistinto'
         return 'Indistinto'
     
-    def extract_email(self, soup):
+    def extract_email(self, index):
         """Extract application email"""
         # Look for email addresses
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        emails = re.findall(email_pattern, soup.get_text())
-        return emails[0] if emails else ''
+        email = EMAIL_PATTERN.search(index.text)
+        return email.group(0) if email else ''
     
-    def extract_salary_type(self, soup):
+    def extract_salary_type(self, index):
         """Extract salary type (in Spanish)"""
-        salary_text = soup.find(text=re.compile(r'Salario|Salary|Sueldo', re.IGNORECASE))
+        salary_text = index.label('salary_any')
         if salary_text:
             text = str(salary_text.parent.get_text(strip=True)).lower()
             if 'mensual' in text or 'monthly' in text or 'mes' in text:
@@ -406,10 +655,10 @@ class CostaRicaJobsScraper:
                 return 'Semanal'
         return 'Mensual'
     
-    def extract_salary(self, soup):
+    def extract_salary(self, index):
         """Extract minimum salary"""
         # Look for "Salario" section
-        salary_label = soup.find(text=re.compile(r'Salario', re.IGNORECASE))
+        salary_label = index.label('salary')
         if salary_label:
             parent = salary_label.find_parent()
             if parent:
@@ -419,28 +668,28 @@ class CostaRicaJobsScraper:
                     text = salary_section.get_text()
                     # Extract just the number, removing commas and currency symbols
                     # Example: "350000 (Moneda Local)" -> "350000"
-                    numbers = re.findall(r'\d+', text.replace(',', '').replace('.', ''))
+                    numbers = NUMBER_PATTERN.findall(text.replace(',', '').replace('.', ''))
                     if numbers:
                         return numbers[0]
         
         return ''
     
-    def extract_max_salary(self, soup):
+    def extract_max_salary(self, index):
         """Extract maximum salary"""
-        salary_text = soup.find(text=re.compile(r'Salario|Salary|Sueldo', re.IGNORECASE))
+        salary_text = index.label('salary_any')
         if salary_text:
             parent = salary_text.find_parent()
             if parent:
                 text = parent.get_text()
                 # Look for salary range (e.g., "1000 - 2000")
-                numbers = re.findall(r'\d+', text.replace(',', '').replace('.', ''))
+                numbers = NUMBER_PATTERN.findall(text.replace(',', '').replace('.', ''))
                 if len(numbers) >= 2:
                     return numbers[1]
         return ''
     
-    def extract_experience(self, soup):
+    def extract_experience(self, index):
         """Extract experience requirement"""
-        exp_text = soup.find(text=re.compile(r'Experiencia Deseada|Experiencia|Experience', re.IGNORECASE))
+        exp_text = index.label('experience')
         if exp_text:
             parent = exp_text.find_parent()
             if parent:
@@ -449,10 +698,10 @@ class CostaRicaJobsScraper:
                     return self.clean_text(value.get_text(strip=True))
         return ''
     
-    def extract_career_level(self, soup):
+    def extract_career_level(self, index):
         """Extract career level (in Spanish)"""
         # Look for "Nivel de Cómputo" or career level
-        level_text = soup.find(text=re.compile(r'Nivel de Cómputo|Career Level|Nivel', re.IGNORECASE))
+        level_text = index.label('career_level')
         if level_text:
             parent = level_text.find_parent()
             if parent:
@@ -464,10 +713,10 @@ class CostaRicaJobsScraper:
                         return self.clean_text(text)
         return ''
     
-    def extract_qualification(self, soup):
+    def extract_qualification(self, index):
         """Extract qualification/education requirement"""
         # Look for "Nivel Académico" section
-        qual_label = soup.find(text=re.compile(r'Nivel Académico', re.IGNORECASE))
+        qual_label = index.label('qualification')
         if qual_label:
             parent = qual_label.find_parent()
             if parent:
@@ -487,17 +736,17 @@ class CostaRicaJobsScraper:
         
         return ''
     
-    def extract_video(self, soup):
+    def extract_video(self, index):
         """Extract video URL if present"""
-        video = soup.find('iframe', src=re.compile(r'youtube|vimeo', re.IGNORECASE))
+        video = index.first('video')
         if video:
             return video['src']
         return ''
     
-    def extract_photos(self, soup):
+    def extract_photos(self, index):
         """Extract additional photos"""
         photos = []
-        images = soup.find_all('img')
+        images = index.all('image')
         for img in images:
             src = img.get('src', '')
             if src and 'logo' not in src.lower() and 'icon' not in src.lower():
@@ -506,9 +755,9 @@ class CostaRicaJobsScraper:
                     photos.append(full_url)
         return ','.join(photos[:5])  # Limit to 5 photos
     
-    def extract_deadline(self, soup):
+    def extract_deadline(self, index):
         """Extract application deadline"""
-        deadline_text = soup.find(text=re.compile(r'Fecha[\s]+Límite|Deadline|Cierre', re.IGNORECASE))
+        deadline_text = index.label('deadline')
         if deadline_text:
             parent = deadline_text.find_parent()
             if parent:
@@ -524,10 +773,10 @@ class CostaRicaJobsScraper:
                         pass
         return self.calculate_expiry_date()
     
-    def extract_location(self, soup):
+    def extract_location(self, index):
         """Extract location - used for address, location, and map_location"""
         # Look for "Ubicación del Puesto" section - this is the most reliable
-        loc_label = soup.find(text=re.compile(r'Ubicación del Puesto', re.IGNORECASE))
+        loc_label = index.label('location')
         if loc_label:
             parent = loc_label.find_parent()
             if parent:
@@ -548,14 +797,14 @@ class CostaRicaJobsScraper:
                         break
         
         # Look for location class
-        location = soup.find(class_=re.compile(r'location|ubicacion'))
+        location = index.first('location_class')
         if location:
             loc_text = location.get_text(strip=True)
             if loc_text:
                 return self.clean_text(loc_text)
         
         # Look for location icon elements
-        location_icons = soup.find_all('i', class_=re.compile(r'location|map|pin'))
+        location_icons = index.all('location_icon')
         for icon in location_icons:
             sibling = icon.find_next_sibling()
             if sibling:
@@ -564,14 +813,26 @@ class CostaRicaJobsScraper:
                     return self.clean_text(loc_text)
         
         # Look for text patterns like "Barrio Tournon, San Jose, Costa Rica"
-        location_pattern = soup.find(text=re.compile(r'[A-Z][a-záéíóúñ\s]+,\s*[A-Z][a-záéíóúñ\s]+,\s*Costa Rica', re.IGNORECASE))
+        location_pattern = index.label('location_text')
         if location_pattern:
             return self.clean_text(location_pattern.strip())
         
         return 'Costa Rica'
     
-    def scrape_all_pages(self, max_pages=44):
-        """Scrape all job listings from all pages"""
+    def scrape_all_pages(self, max_pages=None, known_ids=None, sink=None, checkpoint=None):
+        """Scrape all job listings from all pages
+        
+        The last page is read from the pagination links, max_pages only caps it.
+        
+        With known_ids (a JobStore or set of job IDs), jobs already in it are skipped and
+        the crawl stops at the first page that holds only known jobs.
+        
+        With a sink (see sinks.py), each job is written as soon as it is scraped and
+        not kept in memory, so the returned list is empty.
+        
+        With a CrawlCheckpoint, progress is saved as the crawl goes and a checkpoint
+        loaded from an interrupted run continues where it stopped.
+        """
         all_jobs = []
         all_job_ids = set()  # Track job IDs instead of URLs to avoid false duplicates
         page = 1
@@ -579,72 +840,253 @@ class CostaRicaJobsScraper:
         # Store job IDs per page for debugging
         page_job_ids = {}
         
-        while page <= max_pages:
-            print(f"\n{'='*60}")
-            print(f"PROCESSING PAGE {page}/{max_pages}")
-            print(f"{'='*60}")
-            
-            html = self.get_job_listings_page(page)
-            if not html:
-                print(f"Failed to fetch page {page}, stopping...")
-                break
-            
-            # Extract job URLs from this page
-            job_urls = self.parse_job_listings_from_page(html)
-            
-            # Extract job IDs for comparison
-            current_page_ids = []
-            job_id_to_url = {}
-            for url in job_urls:
-                match = re.search(r'/puesto/(\d+)', url)
-                if match:
-                    job_id = match.group(1)
-                    current_page_ids.append(job_id)
-                    job_id_to_url[job_id] = url
-            
-            page_job_ids[page] = current_page_ids
-            print(f"Job IDs on page {page}: {current_page_ids[:10]}...")
-            
-            print(f"Found {len(job_urls)} job URLs on page {page}")
-            
-            # Filter out jobs we've already scraped by ID
-            new_job_ids = [job_id for job_id in current_page_ids if job_id not in all_job_ids]
-            print(f"New unique job IDs: {len(new_job_ids)}")
+        if checkpoint is not None and checkpoint.resuming:
+            for url in checkpoint.retry_urls:
+                self.retries.add(url)
+            all_job_ids = set(checkpoint.job_ids)
+            page_job_ids = dict(checkpoint.page_job_ids)
+            page = checkpoint.next_page
             
-            if not new_job_ids and page > 1:
-                print("No new unique jobs found on this page, stopping...")
-                print(f"\n📊 SUMMARY: Scraped {len(all_job_ids)} unique jobs total.")
-                break
-            
-            # Add new job IDs to tracking set
-            all_job_ids.update(new_job_ids)
-            
-            # Scrape each NEW job
-            for i, job_id in enumerate(new_job_ids, 1):
-                job_url = job_id_to_url[job_id]
-                print(f"\n[{i}/{len(new_job_ids)}] Processing job ID {job_id}...")
-                job_data = self.get_job_details(job_url)
-                if job_data:
-                    all_jobs.append(job_data)
-                    print(f"  ✓ Scraped: {job_data['_job_title']}")
-                time.sleep(2)  # Be respectful between requests
-            
-            # Check if there are more pages (but respect max_pages limit)
-            if page >= max_pages:
-                print(f"\nReached maximum page limit: {max_pages}")
-                break
+            # Finish the page the last run was on before fetching new ones
+            if checkpoint.pending_urls:
+                print(f"\nFinishing {len(checkpoint.pending_urls)} pending jobs from page {page}...")
+                self._collect_jobs(list(checkpoint.pending_urls), all_jobs, sink, checkpoint)
+                checkpoint.finish_page(page)
+                page += 1
+        
+        scraped_count = len(all_jobs) if sink is None else getattr(sink, 'count', 0)
+        
+        completed = True
+        
+        # Listing pages are fetched ahead in parallel while this loop scrapes details.
+        # An incremental crawl usually stops after a page or two, so it only looks one page ahead
+        window = min(self.prefetch_pages, 1) if known_ids is not None else None
+        listing_pages = self._listing_pages(page, max_pages, window)
+        try:
+            for page, html, job_urls, has_more in listing_pages:
+                print(f"\n{'='*60}")
+                print(f"PROCESSING PAGE {page}{f'/{max_pages}' if max_pages else ''}")
+                print(f"{'='*60}")
+                
+                if not html:
+                    # Keep the checkpoint so --resume retries this page
+                    print(f"Failed to fetch page {page}, stopping...")
+                    completed = False
+                    break
+                
+                # Extract job IDs for comparison
+                current_page_ids = []
+                job_id_to_url = {}
+                for url in job_urls:
+                    job_id = extract_job_id(url)
+                    if job_id:
+                        current_page_ids.append(job_id)
+                        job_id_to_url[job_id] = url
                 
-            has_more = self.check_if_more_pages(html)
-            if not has_more:
-                print(f"\nNo more pages found after page {page}")
-                break
+                page_job_ids[page] = current_page_ids
+                print(f"Job IDs on page {page}: {current_page_ids[:10]}...")
+                
+                print(f"Found {len(job_urls)} job URLs on page {page}")
+                
+                # Filter out jobs we've already scraped by ID
+                new_job_ids = [job_id for job_id in current_page_ids if job_id not in all_job_ids]
+                
+                # Incremental mode: listings are newest first, so a page of known jobs means we caught up
+                if known_ids is not None:
+                    new_job_ids = [job_id for job_id in new_job_ids if job_id not in known_ids]
+                    if current_page_ids and not new_job_ids:
+                        print(f"Page {page} only has already known jobs, stopping...")
+                        print(f"\n📊 SUMMARY: Scraped {len(all_job_ids)} new jobs total.")
+                        break
+                
+                print(f"New unique job IDs: {len(new_job_ids)}")
+                
+                if not new_job_ids and page > 1:
+                    print("No new unique jobs found on this page, stopping...")
+                    print(f"\n📊 SUMMARY: Scraped {len(all_job_ids)} unique jobs total.")
+                    break
+                
+                # Add new job IDs to tracking set
+                all_job_ids.update(new_job_ids)
+                
+                # Scrape each NEW job
+                job_urls = [job_id_to_url[job_id] for job_id in new_job_ids]
+                if checkpoint is not None:
+                    checkpoint.start_page(page, current_page_ids, job_urls)
+                scraped_count += self._collect_jobs(job_urls, all_jobs, sink, checkpoint)
+                if checkpoint is not None:
+                    checkpoint.retry_urls = self.retries.pending()
+                    checkpoint.finish_page(page)
+                self.metrics.page_done()
+                
+                # Jobs that failed on earlier pages and whose backoff is over
+                scraped_count += self._retry_deferred_jobs(all_jobs, sink, checkpoint)
+                
+                # Check if there are more pages (but respect max_pages limit)
+                if max_pages and page >= max_pages:
+                    print(f"\nReached maximum page limit: {max_pages}")
+                    break
+                    
+                if not has_more:
+                    print(f"\nNo more pages found after page {page}")
+                    break
+                
+                print(f"\nTotal unique jobs scraped so far: {scraped_count} "
+                      f"({self.rate_limiter.current_rate:.2f} requests/s)")
             
-            page += 1
-            print(f"\nTotal unique jobs scraped so far: {len(all_jobs)}")
-            time.sleep(3)  # Longer delay between pages
+            # Give every failed job its remaining attempts before finishing
+            self._retry_deferred_jobs(all_jobs, sink, checkpoint, wait=True)
+        finally:
+            listing_pages.close()
+            # Also on errors and Ctrl+C, so no worker processes outlive the crawl
+            if self.parse_pool:
+                self.parse_pool.close()
+        self.failed_job_ids = self.retries.report(lambda url: extract_job_id(url) or url)
+        
+        if checkpoint is not None and completed:
+            checkpoint.finish()
+        
+        self.metrics.complete = completed
+        self.metrics.write()
         
         return all_jobs
     
+    def _retry_deferred_jobs(self, all_jobs, sink=None, checkpoint=None, wait=False):
+        """Scrape the deferred job URLs that are due, return the count
+        
+        With wait=True, sleep until the next URL is due (and the host's circuit is
+        closed) and keep going until every URL succeeded or ran out of attempts.
+        """
+        count = 0
+        while True:
+            circuit_wait = self.circuit.wait_time(self.base_url)
+            urls = self.retries.due() if not circuit_wait else []
+            if urls:
+                print(f"\n↻ Retrying {len(urls)} failed jobs...")
+                if checkpoint is not None:
+                    checkpoint.retry_urls = self.retries.pending() + urls
+                count += self._collect_jobs(urls, all_jobs, sink, checkpoint)
+                if checkpoint is not None:
+                    checkpoint.retry_urls = self.retries.pending()
+                    checkpoint.save()
+                continue
+            
+            delay = self.retries.next_delay()
+            if not wait or delay is None:
+                return count
+            delay = max(delay, circuit_wait, 0.1)
+            time.sleep(delay)
+            self.metrics.slept(delay)
+    
+    def _listing_pages(self, first_page, max_pages=None, window=None):
+        """Yield (page, html, job_urls, has_more) in page order, fetching up to window pages ahead in parallel
+        
+        The last page comes from the pagelocales links of the pages fetched so far.
+        The pagination block may only link a few pages ahead, so it can grow as the
+        crawl goes. Pages up to it (and max_pages) are fetched by a small thread pool
+        while the consumer scrapes details, and handed out in page order. It stops
+        after a failed page, the last page or once the consumer stops reading.
+        """
+        window = self.prefetch_pages if window is None else window
+        last_page = first_page
+        
+        def load(page):
+            html = self._fetch_listing_page(page)
+            job_urls = self.parse_job_listings_from_page(html)
+            last = scan_last_page(html) if html else None
+            if html and last is None:
+                # No pagelocales links - fall back to looking for any pagination
+                last = page + 1 if self.check_if_more_pages(html) else page
+            return page, html, job_urls, last
+        
+        executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix='listing') if window > 0 else None
+        pending = collections.deque()  # futures (or page numbers without a pool), in page order
+        next_page = first_page
+        
+        def submit_ahead():
+            nonlocal next_page
+            limit = last_page if max_pages is None else min(last_page, max_pages)
+            while next_page <= limit and len(pending) < max(window, 1):
+                pending.append(executor.submit(load, next_page) if executor else next_page)
+                next_page += 1
+        
+        try:
+            submit_ahead()
+            while pending:
+                head = pending.popleft()
+                page, html, job_urls, last = head.result() if executor else load(head)
+                if last:
+                    last_page = max(last_page, last)
+                has_more = bool(html) and page < last_page and (max_pages is None or page < max_pages)
+                if html and has_more:
+                    submit_ahead()
+                yield page, html, job_urls, has_more
+                if not html or not has_more:
+                    return
+        finally:
+            for future in pending:
+                if executor:
+                    future.cancel()
+            if executor:
+                executor.shutdown(wait=True)
+    
+    def _collect_jobs(self, job_urls, all_jobs, sink=None, checkpoint=None, save_every=10):
+        """Scrape job_urls into the sink (or all_jobs), keeping the checkpoint in step, return the count"""
+        count = 0
+        try:
+            for job_data in self.scrape_job_details(job_urls):
+                count += 1
+                self.metrics.job_scraped()
+                self.metrics.maybe_write()
+                if sink is not None:
+                    sink.write(job_data)
+                else:
+                    all_jobs.append(job_data)
+                if checkpoint is not None:
+                    checkpoint.job_done(job_data['_job_apply_url'])
+                    if count % save_every == 0:
+                        self._save_progress(sink, checkpoint)
+        finally:
+            # Page boundary (or crash) - make everything so far durable
+            if checkpoint is not None:
+                self._save_progress(sink, checkpoint)
+            elif sink is not None:
+                sink.sync()
+        return count
+    
+    def _save_progress(self, sink, checkpoint):
+        """Sync the sink, then save the checkpoint with the synced file sizes
+        
+        The sink goes first so the checkpoint never claims jobs that are not on disk,
+        and a resumed run cuts the files back to these sizes, dropping jobs written after.
+        """
+        if sink is not None:
+            sink.sync()
+            checkpoint.sink_offsets = sink.synced_offsets()
+        checkpoint.save()
+    
+    def scrape_job_details(self, job_urls):
+        """Fetch detail pages with the worker pool and yield jobs in listing order as they finish"""
+        total = len(job_urls)
+        
+        def process(item):
+            i, job_url = item
+            job_id = extract_job_id(job_url) or job_url
+            print(f"\n[{i}/{total}] Processing job ID {job_id}...")
+            job_data = self.get_job_details(job_url)
+            if job_data:
+                print(f"  ✓ Scraped: {job_data['_job_title']}")
+            return job_data
+        
+        items = list(enumerate(job_urls, 1))
+        if self.workers == 1 or total <= 1:
+            results = map(process, items)
+            yield from (job for job in results if job)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = executor.map(process, items)
+                yield from (job for job in results if job)
+    
     def scrape_first_page_only(self):
         """Scrape only the first page (for weekly updates)"""
         print("\n" + "="*60)
@@ -662,7 +1104,7 @@ class CostaRicaJobsScraper:
     def save_to_json(self, jobs, filename='costa_rica_jobs.json'):
         """Save scraped jobs to JSON file"""
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(jobs, f, ensure_ascii=False, indent=2)
+            json.dump([job_dict(job) for job in jobs], f, ensure_ascii=False, indent=2)
         print(f"\n✓ Saved {len(jobs)} jobs to {filename}")
     
     def save_to_csv(self, jobs, filename='costa_rica_jobs.csv'):
@@ -673,44 +1115,98 @@ class CostaRicaJobsScraper:
             print("No jobs to save")
             return
         
-        keys = jobs[0].keys()
         with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
+            writer = csv.DictWriter(f, fieldnames=JOB_FIELDS)
             writer.writeheader()
             writer.writerows(jobs)
         print(f"✓ Saved {len(jobs)} jobs to {filename}")
 
 
-def initial_scrape():
-    """Run initial scrape of all 44 pages"""
-    scraper = CostaRicaJobsScraper()
+def initial_scrape(resume=False, archive_dir=None, codec='gzip', **options):
+    """Scrape every listings page, streaming each job to disk as it is scraped, return the job count
+    
+    Jobs go to costa_rica_jobs_full.jsonl and costa_rica_jobs_full.csv (renamed from
+    their .part files once the crawl completes) and into the job store. Run export_jobs
+    for costa_rica_jobs_full.json. Progress is checkpointed; with resume=True an
+    interrupted run continues where it stopped. With archive_dir, the finished NDJSON
+    file is also archived as today's 'initial' partition.
+    """
+    scraper = CostaRicaJobsScraper(cache_dir=HTTP_CACHE_DIR, **options)
     print("\n" + "="*60)
     print("INITIAL SCRAPE - ALL PAGES")
     print("="*60)
     print("This may take a while due to respectful delays...")
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
-    jobs = scraper.scrape_all_pages(max_pages=1)
+    checkpoint = CrawlCheckpoint.load() if resume else CrawlCheckpoint()
+    append = checkpoint.resuming
+    
+    # Jobs go straight to NDJSON, CSV and the job store - an unfinished crawl keeps the .part files
+    store = open_job_store()
+    offsets = checkpoint.sink_offsets
+    sink = MultiSink(
+        JsonlSink('costa_rica_jobs_full.jsonl', append=append, offset=offsets.get('costa_rica_jobs_full.jsonl.part')),
+        CsvSink('costa_rica_jobs_full.csv', append=append, offset=offsets.get('costa_rica_jobs_full.csv.part')),
+        StoreSink(store),
+    )
+    try:
+        scraper.scrape_all_pages(sink=sink, checkpoint=checkpoint)
+    finally:
+        sink.close(complete=checkpoint.complete)
+        store.close()
+    
+    if not checkpoint.complete:
+        print("\n⚠️ Crawl stopped early - run again with --resume to continue")
+    elif archive_dir:
+        archive_jsonl('costa_rica_jobs_full.jsonl', archive_dir, 'initial', codec)
     
     print("\n" + "="*60)
     print("SCRAPING COMPLETE")
     print("="*60)
+    scraper.print_network_summary()
     
-    if jobs:
-        scraper.save_to_json(jobs, 'costa_rica_jobs_full.json')
-        scraper.save_to_csv(jobs, 'costa_rica_jobs_full.csv')
+    if sink.count:
         print(f"\n✅ Initial scrape complete!")
-        print(f"Total jobs scraped: {len(jobs)}")
+        print(f"Total jobs scraped: {sink.count}")
         print(f"Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     else:
         print("\n⚠️ No jobs were scraped")
     
-    return jobs
+    return sink.count
+
+
+def open_job_store():
+    """Open the SQLite job store, importing the old JSON dataset the first time"""
+    store = JobStore()
+    if len(store) == 0:
+        store.import_json('costa_rica_jobs_full.json')
+    return store
+
 
+def save_to_store(jobs):
+    """Upsert scraped jobs into the job store"""
+    store = open_job_store()
+    added = store.upsert(jobs)
+    print(f"Added {added} new jobs, refreshed {len(jobs) - added}")
+    print(f"Total jobs in database: {len(store)}")
+    store.close()
+    return added
 
-def weekly_update():
-    """Run weekly update (first page only)"""
-    scraper = CostaRicaJobsScraper()
+
+def export_jobs(json_filename='costa_rica_jobs_full.json', csv_filename='costa_rica_jobs_full.csv'):
+    """Export every job in the store to JSON and CSV"""
+    store = open_job_store()
+    store.export_json(json_filename)
+    store.export_csv(csv_filename)
+    store.close()
+
+
+def weekly_update(archive_dir=None, codec='gzip', **options):
+    """Run weekly update (first page only) into the job store, return the jobs
+    
+    The full JSON / CSV files are not rewritten; run export_jobs to refresh them from the store.
+    """
+    scraper = CostaRicaJobsScraper(cache_dir=HTTP_CACHE_DIR, **options)
     print(f"\nStarted at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     jobs = scraper.scrape_first_page_only()
@@ -718,30 +1214,13 @@ def weekly_update():
     print("\n" + "="*60)
     print("WEEKLY UPDATE COMPLETE")
     print("="*60)
+    scraper.print_network_summary()
     
     if jobs:
-        # Load existing jobs
-        existing_jobs = []
-        if os.path.exists('costa_rica_jobs_full.json'):
-            with open('costa_rica_jobs_full.json', 'r', encoding='utf-8') as f:
-                existing_jobs = json.load(f)
-            print(f"Loaded {len(existing_jobs)} existing jobs from file")
-        
-        # Add new jobs (avoiding duplicates by URL)
-        existing_urls = {job['_job_apply_url'] for job in existing_jobs}
-        new_jobs = [job for job in jobs if job['_job_apply_url'] not in existing_urls]
-        
-        if new_jobs:
-            existing_jobs.extend(new_jobs)
-            scraper.save_to_json(existing_jobs, 'costa_rica_jobs_full.json')
-            scraper.save_to_csv(existing_jobs, 'costa_rica_jobs_full.csv')
-            print(f"\n✅ Weekly update complete!")
-            print(f"Added {len(new_jobs)} new jobs")
-            print(f"Total jobs in database: {len(existing_jobs)}")
-        else:
-            print("\n✅ Weekly update complete!")
-            print("No new jobs found")
-            print(f"Total jobs in database: {len(existing_jobs)}")
+        save_to_store(jobs)
+        if archive_dir:
+            write_partition(jobs, archive_dir, 'weekly', codec, append=True)
+        print("\n✅ Weekly update complete!")
     else:
         print("\n⚠️ No jobs were scraped in weekly update")
     
@@ -749,9 +1228,40 @@ def weekly_update():
     return jobs
 
 
-def scrape_two_pages_only():
+def incremental_update(max_pages=None, archive_dir=None, codec='gzip', **options):
+    """Scrape only the jobs posted since the last run, stopping at the first page of known jobs"""
+    scraper = CostaRicaJobsScraper(cache_dir=HTTP_CACHE_DIR, **options)
+    store = open_job_store()
+    print("\n" + "="*60)
+    print("INCREMENTAL UPDATE - NEW JOBS SINCE LAST RUN")
+    print("="*60)
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    
+    jobs = scraper.scrape_all_pages(max_pages=max_pages, known_ids=store)
+    
+    print("\n" + "="*60)
+    print("INCREMENTAL UPDATE COMPLETE")
+    print("="*60)
+    scraper.print_network_summary()
+    
+    if jobs:
+        # Only successfully scraped jobs become known - failures are retried next run
+        added = store.upsert(jobs)
+        if archive_dir:
+            write_partition(jobs, archive_dir, 'incremental', codec, append=True)
+        print(f"\n✅ Incremental update complete! Added {added} new jobs")
+    else:
+        print("\n✅ Incremental update complete! No new jobs since last run")
+    print(f"Total jobs in database: {len(store)}")
+    store.close()
+    
+    print(f"Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return jobs
+
+
+def scrape_two_pages_only(archive_dir=None, codec='gzip', **options):
     """Run scrape of first two pages only"""
-    scraper = CostaRicaJobsScraper()
+    scraper = CostaRicaJobsScraper(cache_dir=HTTP_CACHE_DIR, **options)
     print(f"\nStarted at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     jobs = scraper.scrape_two_pages()
@@ -759,10 +1269,13 @@ def scrape_two_pages_only():
     print("\n" + "="*60)
     print("TWO-PAGE SCRAPE COMPLETE")
     print("="*60)
+    scraper.print_network_summary()
     
     if jobs:
         scraper.save_to_json(jobs, 'costa_rica_jobs_two_pages.json')
         scraper.save_to_csv(jobs, 'costa_rica_jobs_two_pages.csv')
+        if archive_dir:
+            write_partition(jobs, archive_dir, 'two_pages', codec)
         print(f"\n✅ Two-page scrape complete!")
         print(f"Total jobs scraped: {len(jobs)}")
         print(f"Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -772,9 +1285,9 @@ def scrape_two_pages_only():
     return jobs
 
 
-def test_pagination():
+def test_pagination(**options):
     """Test function to check if pagination is working - shows job IDs from each page"""
-    scraper = CostaRicaJobsScraper()
+    scraper = CostaRicaJobsScraper(**options)
     
     print("\n" + "="*60)
     print("TESTING PAGINATION - Checking Job IDs")
@@ -791,9 +1304,9 @@ def test_pagination():
             
             job_ids = []
             for url in job_urls:
-                match = re.search(r'/puesto/(\d+)', url)
-                if match:
-                    job_ids.append(match.group(1))
+                job_id = extract_job_id(url)
+                if job_id:
+                    job_ids.append(job_id)
             
             print(f"\nJob IDs found on page {page}:")
             print(f"Total: {len(job_ids)}")
@@ -801,8 +1314,6 @@ def test_pagination():
             print(f"\nSample URLs:")
             for i, url in enumerate(job_urls[:3], 1):
                 print(f"  {i}. {url}")
-        
-        time.sleep(3)
     
     print("\n" + "="*60)
     print("PAGINATION TEST COMPLETE")
@@ -810,16 +1321,56 @@ def test_pagination():
 
 
 if __name__ == "__main__":
-    # CHOOSE ONE OF THE FOLLOWING OPTIONS:
+    import argparse
     
-    # Option 1: Scrape ONLY first 2 pages (DEFAULT)
-    scrape_two_pages_only()
+    parser = argparse.ArgumentParser(description="Scrape Costa Rica job listings from empleos.net")
+    parser.add_argument('mode', nargs='?', default='two-pages',
+                        choices=['two-pages', 'test-pagination', 'initial', 'weekly', 'incremental', 'export'],
+                        help="two-pages (default): first pages only; test-pagination: show job IDs per page; "
+                             "initial: all pages; weekly: first page into the job store; "
+                             "incremental: only jobs newer than the last run; "
+                             "export: write the job store to costa_rica_jobs_full.json/.csv")
+    parser.add_argument('--resume', action='store_true',
+                        help="initial mode: continue an interrupted crawl from its checkpoint")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='DIR',
+                          help="save every response to a cassette directory while scraping")
+    cassette.add_argument('--replay', metavar='DIR',
+                          help="serve every response from a recorded cassette, without network access")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_DIR, metavar='DIR',
+                        help=f"time each crawl stage and write profile reports to DIR (default {PROFILE_DIR})")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="write crawl metrics to PATH.prom (Prometheus textfile) and PATH.json during the run")
+    parser.add_argument('--archive', nargs='?', const=ARCHIVE_DIR, metavar='DIR',
+                        help=f"also write the jobs as compressed NDJSON partitioned by date under DIR "
+                             f"(default {ARCHIVE_DIR}), listed in DIR/manifest.json")
+    parser.add_argument('--compression', choices=list(CODECS), default='gzip',
+                        help="archive compression (zstd needs the zstandard package)")
+    parser.add_argument('--parse-processes', type=int, nargs='?', const=-1, default=0, metavar='N',
+                        help="parse detail pages in N worker processes (no N: one per CPU core)")
+    args = parser.parse_args()
     
-    # Option 2: Test pagination without full scraping (UNCOMMENT to test)
-    # test_pagination()
+    options = {}
+    if args.record or args.replay:
+        options = {'cassette_dir': args.record or args.replay, 'record': bool(args.record)}
+    if args.profile:
+        options['profile_dir'] = args.profile
+    if args.metrics:
+        options['metrics_path'] = args.metrics
+    if args.parse_processes:
+        options['parse_processes'] = None if args.parse_processes < 0 else args.parse_processes
     
-    # Option 3: For initial scrape (all pages up to 44) - COMMENT OUT if not needed:
-    # initial_scrape()
+    archive = {'archive_dir': args.archive, 'codec': args.compression} if args.archive else {}
     
-    # Option 4: For weekly updates (first page only) - COMMENT OUT if not needed:
-    # weekly_update()
\ No newline at end of file
+    if args.mode == 'two-pages':
+        scrape_two_pages_only(**archive, **options)
+    elif args.mode == 'test-pagination':
+        test_pagination(**options)
+    elif args.mode == 'initial':
+        initial_scrape(resume=args.resume, **archive, **options)
+    elif args.mode == 'weekly':
+        weekly_update(**archive, **options)
+    elif args.mode == 'incremental':
+        incremental_update(**archive, **options)
+    elif args.mode == 'export':
+        export_jobs()